@@ -6,6 +6,8 @@ import sys
 
 def main():
     """Run administrative tasks."""
+    if len(sys.argv) > 1 and sys.argv[1] == "test":
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "startup_go.test_settings")
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "startup_go.settings")
     try:
         from django.core.management import execute_from_command_line
@@ -6,6 +6,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import Project
 from .serializers import ProjectSerializer
 from .filters import ProjectFilter
+from users.utils import ensure_profile
 
 # Create your views here.
 
@@ -23,9 +24,9 @@ class ProjectViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-        Return all projects.
+        Return all projects, joined with the creator the serializer nests.
         """
-        return Project.objects.all()
+        return Project.objects.select_related('created_by')
 
     def perform_create(self, serializer):
         """
@@ -34,11 +35,11 @@ class ProjectViewSet(viewsets.ModelViewSet):
         project = serializer.save(created_by=self.request.user)
         
         # Add project ID to creator's profile
-        profile = self.request.user.profile
+        profile = ensure_profile(self.request.user)
         if not profile.projects:
             profile.projects = []
         profile.projects.append(str(project.id))
-        profile.save()
+        profile.save(update_fields=['projects'])
 
     def perform_update(self, serializer):
         """
@@ -51,10 +52,10 @@ class ProjectViewSet(viewsets.ModelViewSet):
         Delete a project and remove it from the creator's profile.
         """
         # Remove project ID from creator's profile
-        profile = instance.created_by.profile
+        profile = ensure_profile(instance.created_by)
         if profile.projects and str(instance.id) in profile.projects:
             profile.projects.remove(str(instance.id))
-            profile.save()
+            profile.save(update_fields=['projects'])
         
         # Delete the project
         instance.delete()
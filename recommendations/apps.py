@@ -15,17 +15,17 @@ class RecommendationsConfig(AppConfig):
         """
         if not settings.DEBUG:  
             try:
-                from .service import RecommendationService
+                from .service import get_service
                 
-                # Initialize recommendation service
-                service = RecommendationService()
+                # Initialize the shared recommendation service
+                service = get_service()
                 
                 # Load index from Git LFS 
                 repo_path = getattr(settings, 'FAISS_INDEX_REPO_PATH', os.path.join(settings.BASE_DIR, 'faiss_indices'))
                 index_path = getattr(settings, 'FAISS_INDEX_PATH', 'models/faiss_index')
                 branch = getattr(settings, 'FAISS_INDEX_BRANCH', 'main')
                 
-                success = service.load_faiss_index_from_git_lfs(
+                success = service.ensure_faiss_index_loaded(
                     repo_path=repo_path,
                     index_path=index_path,
                     branch=branch
@@ -9,6 +9,12 @@ import torch.nn.functional as F
 from .faiss_utils import FAISSIndexManager
 
 class CofounderPairDataset(Dataset):
+    # Profile columns read by _get_user_features
+    PROFILE_FEATURE_FIELDS = frozenset({
+        'skills', 'bio', 'industry', 'role_interest',
+        'years_experience', 'num_projects', 'location', 'education_level'
+    })
+    
     def __init__(
         self,
         text_encoder: str = 'all-MiniLM-L6-v2',
@@ -18,17 +24,27 @@ class CofounderPairDataset(Dataset):
         min_data_size_for_ivf: int = 10000,
         nlist: int = 100,
         nprobe: int = 10,
-        nbits: int = 8
+        nbits: int = 8,
+        return_indices: bool = False
     ):
         self.text_encoder = SentenceTransformer(text_encoder)
         self.max_length = max_length
         self.negative_ratio = negative_ratio
         self.use_faiss = use_faiss
+        # When True, items are (row_a, row_b, label) indexing into self.embeddings
+        # so the trainer can embed each unique user once per batch
+        self.return_indices = return_indices
         
         # Load all user profiles
         self.users = list(User.objects.all())
         self.user_profiles = {user.id: self._get_user_features(user) for user in self.users}
         
+        # Encode every user once into a single shared-memory tensor, so
+        # DataLoader workers read the same pages instead of re-encoding
+        self.user_ids = [user.id for user in self.users]
+        self.user_index = {user_id: i for i, user_id in enumerate(self.user_ids)}
+        self.embeddings = self._build_embedding_table()
+        
         # Get positive pairs from recommendations
         self.positive_pairs = self._get_positive_pairs()
         
@@ -38,17 +54,7 @@ class CofounderPairDataset(Dataset):
             
     def _init_faiss_index(self, min_data_size_for_ivf: int, nlist: int, nprobe: int, nbits: int):
         """Initialize FAISS index for fast similarity search"""
-        # Get all user embeddings
-        all_embeddings = []
-        self.user_ids = []
-        
-        for user in self.users:
-            embedding = self._get_user_embedding(user.id)
-            all_embeddings.append(embedding)
-            self.user_ids.append(user.id)
-            
-        # Convert to tensor
-        all_embeddings = torch.stack(all_embeddings)
+        all_embeddings = self.embeddings
         
         # Create FAISS index manager
         self.index_manager = FAISSIndexManager(
@@ -139,8 +145,21 @@ class CofounderPairDataset(Dataset):
         # this is a placeholder - implement proper encoding based on your categories
         return torch.cat([location_embedding, education_embedding])
     
+    def _build_embedding_table(self) -> torch.Tensor:
+        """Encode all users into one (num_users, dim) tensor in shared memory"""
+        if not self.user_ids:
+            return torch.empty(0)
+        embeddings = torch.stack([
+            self._compute_user_embedding(user_id).cpu() for user_id in self.user_ids
+        ])
+        return embeddings.share_memory_()
+    
     def _get_user_embedding(self, user_id: int) -> torch.Tensor:
         """Get complete user embedding"""
+        return self.embeddings[self.user_index[user_id]]
+    
+    def _compute_user_embedding(self, user_id: int) -> torch.Tensor:
+        """Encode a user's features into a single embedding"""
         profile = self.user_profiles[user_id]
         
         text_embedding = self._encode_text(profile['text'])
@@ -157,13 +176,20 @@ class CofounderPairDataset(Dataset):
         pos_idx = idx % len(self.positive_pairs)
         user_a_id, user_b_id = self.positive_pairs[pos_idx]
         
+        # Create label (1 for positive pairs)
+        label = torch.tensor(1.0)
+        
+        if self.return_indices:
+            return (
+                torch.tensor(self.user_index[user_a_id]),
+                torch.tensor(self.user_index[user_b_id]),
+                label
+            )
+        
         # Get embeddings
         embedding_a = self._get_user_embedding(user_a_id)
         embedding_b = self._get_user_embedding(user_b_id)
         
-        # Create label (1 for positive pairs)
-        label = torch.tensor(1.0)
-        
         return embedding_a, embedding_b, label 
     
 class CofounderPairDatasetWithHistory(Dataset):
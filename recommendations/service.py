@@ -2,16 +2,52 @@ import torch
 from typing import List, Dict, Any
 import numpy as np
 from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.models import Profile
 from .algorithm import TwinTowerModel
 from .dataset import CofounderPairDataset
 from .faiss_utils.manager import FAISSIndexManager
 import logging
 from functools import lru_cache
 import os
+import threading
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+_service = None
+_service_lock = threading.Lock()
+
+def get_service() -> 'RecommendationService':
+    """
+    Return the process-wide RecommendationService, creating it on first use
+
+    The service holds the model and FAISS index in memory, so it is shared
+    across requests instead of being rebuilt (and reloaded from Git LFS) per call.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = RecommendationService()
+    return _service
+
+@receiver([post_save, post_delete], sender=Profile)
+def _drop_dataset_on_profile_change(sender, update_fields=None, **kwargs):
+    """
+    Drop the shared service's user snapshot when a profile's features change
+
+    Fires for new users too, since registration creates their profile, and
+    for deleted users through the cascade. Saves limited to columns the
+    dataset does not read (friends, avatar, projects...) keep the snapshot.
+    """
+    if _service is None:
+        return
+    if update_fields is not None and not CofounderPairDataset.PROFILE_FEATURE_FIELDS & set(update_fields):
+        return
+    _service.invalidate_dataset()
+
 class RecommendationService:
     def __init__(self, model_path: str = 'models/twin_tower.pt'):
         self.model_path = model_path
@@ -19,6 +55,8 @@ class RecommendationService:
         self.model = None
         self.dataset = None
         self.index_manager = None
+        # Guards index loads/updates on the shared instance
+        self.lock = threading.RLock()
         
     @lru_cache(maxsize=1)
     def _load_model(self) -> TwinTowerModel:
@@ -43,14 +81,33 @@ class RecommendationService:
         return model
     
     def _get_dataset(self) -> CofounderPairDataset:
-        """Get dataset instance for feature extraction"""
-        if self.dataset is None:
-            self.dataset = CofounderPairDataset()
-        return self.dataset
+        """Get dataset instance for feature extraction, rebuilding it if it was dropped"""
+        dataset = self.dataset
+        if dataset is None:
+            with self.lock:
+                if self.dataset is None:
+                    self.dataset = CofounderPairDataset()
+                dataset = self.dataset
+        return dataset
+    
+    def invalidate_dataset(self):
+        """Drop the user snapshot so the next lookup rebuilds it from the database"""
+        self.dataset = None
     
-    def _get_user_embedding(self, user_id: int) -> torch.Tensor:
-        """Get embedding for a single user"""
+    def _get_dataset_covering(self, user_ids: List[int]) -> CofounderPairDataset:
+        """
+        Get a dataset snapshot to use for a whole call, rebuilding it at most
+        once if any of user_ids is missing from it
+        """
         dataset = self._get_dataset()
+        if any(user_id not in dataset.user_index for user_id in user_ids):
+            # 快照之后注册的用户 (例如在其他进程中), 重建一次快照
+            self.invalidate_dataset()
+            dataset = self._get_dataset()
+        return dataset
+    
+    def _get_user_embedding(self, dataset: CofounderPairDataset, user_id: int) -> torch.Tensor:
+        """Get embedding for a single user from the given snapshot"""
         return dataset._get_user_embedding(user_id).to(self.device)
     
     def get_recommendations_for_user(
@@ -73,13 +130,18 @@ class RecommendationService:
         if self.model is None:
             self.model = self._load_model()
             
-        # Get target user embedding
-        target_embedding = self._get_user_embedding(user_id)
-        
-        # Get all other user embeddings
+        # Get all other users
         all_users = User.objects.exclude(id=user_id)
         if exclude_ids:
             all_users = all_users.exclude(id__in=exclude_ids)
+        all_users = list(all_users)
+        
+        # One snapshot for the whole call; users it still lacks are skipped
+        dataset = self._get_dataset_covering([user_id, *(user.id for user in all_users)])
+        all_users = [user for user in all_users if user.id in dataset.user_index]
+        
+        # Get target user embedding
+        target_embedding = self._get_user_embedding(dataset, user_id)
             
         # Batch process embeddings for efficiency
         batch_size = 32
@@ -88,7 +150,7 @@ class RecommendationService:
         for i in range(0, len(all_users), batch_size):
             batch_users = all_users[i:i + batch_size]
             batch_embeddings = torch.stack([
-                self._get_user_embedding(user.id)
+                self._get_user_embedding(dataset, user.id)
                 for user in batch_users
             ])
             
@@ -144,6 +206,33 @@ class RecommendationService:
             logger.error(f"Failed to load FAISS index: {e}")
             return False
             
+    def ensure_faiss_index_loaded(self, repo_path: str, index_path: str, branch: str = 'main') -> bool:
+        """
+        Load FAISS index from Git LFS unless it has already been loaded
+        
+        A failed load is retried on the next call. Once the index is loaded
+        this returns without taking the lock, so reads don't wait on updates.
+        
+        Args:
+            repo_path: Path to the Git repository
+            index_path: Relative path to the index file
+            branch: Git branch to use
+            
+        Returns:
+            bool: True if an index is available, False otherwise
+        """
+        if self._faiss_index_loaded():
+            return True
+        with self.lock:
+            if not self._faiss_index_loaded():
+                self.load_faiss_index_from_git_lfs(repo_path, index_path, branch)
+            return self._faiss_index_loaded()
+    
+    def _faiss_index_loaded(self) -> bool:
+        """Whether a FAISS index is currently loaded"""
+        index_manager = self.index_manager
+        return index_manager is not None and index_manager.index is not None
+            
     def save_faiss_index_to_git_lfs(self, repo_path: str, index_path: str, commit_message: str = "Update FAISS index") -> bool:
         """
         Save FAISS index to Git LFS
@@ -175,11 +264,14 @@ class RecommendationService:
             
         try:
             # 获取所有用户的嵌入
-            all_users = User.objects.all()
+            user_ids = list(User.objects.values_list('id', flat=True))
+            dataset = self._get_dataset_covering(user_ids)
             embeddings = []
             
-            for user in all_users:
-                embedding = self._get_user_embedding(user.id)
+            for user_id in user_ids:
+                if user_id not in dataset.user_index:
+                    continue
+                embedding = self._get_user_embedding(dataset, user_id)
                 embeddings.append(embedding)
                 
             # 更新索引
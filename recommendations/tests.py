@@ -7,8 +7,12 @@ from users.models import Profile
 import os
 import shutil
 import tempfile
+from unittest import mock
+import torch
 from django.conf import settings
-from .service import RecommendationService
+from . import service as service_module
+from .service import get_service
+from .dataset import CofounderPairDataset
 from .faiss_utils import FAISSIndexManager
 
 class RecommendationTests(TestCase):
@@ -65,6 +69,9 @@ class FAISSViewTests(TestCase):
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
         
+        # 重置共享的推荐服务
+        service_module._service = None
+        
         # 创建临时目录用于测试
         self.test_dir = tempfile.mkdtemp()
         self.repo_path = os.path.join(self.test_dir, 'test_repo')
@@ -103,7 +110,7 @@ class FAISSViewTests(TestCase):
     def test_get_faiss_status_initialized(self):
         """Test getting FAISS status when initialized"""
         # 初始化 FAISS 索引
-        service = RecommendationService()
+        service = get_service()
         service.index_manager = FAISSIndexManager(embedding_dim=384 + 2 + 15)
         
         url = reverse('faiss-status')
@@ -164,6 +171,7 @@ class RecommendationViewTests(TestCase):
         )
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
+        service_module._service = None
         
     def test_get_recommendations(self):
         """Test getting recommendations"""
@@ -180,4 +188,96 @@ class RecommendationViewTests(TestCase):
         response = self.client.post(url)
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data['status'], 'success')
\ No newline at end of file
+        self.assertEqual(response.data['status'], 'success')
+
+class RecommendationServiceTests(TestCase):
+    def setUp(self):
+        """Set up a fresh shared service with a stub model and dataset"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            username='otheruser',
+            password='testpass123'
+        )
+        service_module._service = None
+        self.service = get_service()
+        self.service.model = mock.Mock()
+        self.service.model.get_similarity.side_effect = lambda a, b: torch.ones(len(b))
+        self.hidden_ids = set()
+        patcher = mock.patch.object(
+            service_module, 'CofounderPairDataset', side_effect=self._snapshot,
+            PROFILE_FEATURE_FIELDS=CofounderPairDataset.PROFILE_FEATURE_FIELDS
+        )
+        self.dataset_cls = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _snapshot(self):
+        """Stand-in dataset that, like the real one, only knows users existing when built"""
+        dataset = mock.Mock()
+        user_ids = User.objects.exclude(id__in=self.hidden_ids).values_list('id', flat=True)
+        dataset.user_index = {uid: i for i, uid in enumerate(user_ids)}
+        dataset._get_user_embedding.side_effect = lambda uid: torch.ones(4) * dataset.user_index[uid]
+        return dataset
+
+    def test_user_registered_after_first_call_is_recommended(self):
+        """Test that the cached snapshot is rebuilt when a user registers"""
+        self.service.get_recommendations_for_user(self.user.id)
+        new_user = User.objects.create_user(username='newuser', password='testpass123')
+
+        recommendations = self.service.get_recommendations_for_user(self.user.id)
+
+        self.assertIn(new_user.id, [rec['user_id'] for rec in recommendations])
+        self.assertEqual(self.dataset_cls.call_count, 2)
+
+    def test_unknown_user_rebuilds_stale_snapshot(self):
+        """Test that a user missing from the snapshot (e.g. registered in another process) triggers a rebuild"""
+        new_user = User.objects.create_user(username='newuser', password='testpass123')
+        self.hidden_ids = {new_user.id}
+        self.service.dataset = self._snapshot()
+        self.hidden_ids = set()
+
+        recommendations = self.service.get_recommendations_for_user(self.user.id)
+
+        self.assertIn(new_user.id, [rec['user_id'] for rec in recommendations])
+        self.assertEqual(self.dataset_cls.call_count, 1)
+
+    def test_unknown_user_rebuilds_at_most_once_per_call(self):
+        """Test that a user the dataset never contains is skipped after a single rebuild"""
+        self.hidden_ids = {self.other_user.id}
+
+        recommendations = self.service.get_recommendations_for_user(self.user.id)
+
+        self.assertEqual(recommendations, [])
+        self.assertEqual(self.dataset_cls.call_count, 2)
+
+    def test_only_feature_changes_drop_snapshot(self):
+        """Test that profile saves which don't touch dataset features keep the snapshot"""
+        self.service.get_recommendations_for_user(self.user.id)
+        profile = self.user.profile
+
+        profile.friends = [self.other_user.id]
+        profile.save(update_fields=['friends'])
+        self.assertIsNotNone(self.service.dataset)
+
+        profile.skills = 'Go'
+        profile.save(update_fields=['skills'])
+        self.assertIsNone(self.service.dataset)
+
+        self.service.get_recommendations_for_user(self.user.id)
+        profile.save()
+        self.assertIsNone(self.service.dataset)
+
+    def test_failed_index_load_is_retried(self):
+        """Test that a failed FAISS load is retried instead of sticking to the fallback"""
+        def load(manager, repo_path, index_path, branch):
+            manager.index = mock.Mock() if load_results.pop(0) else None
+            return manager.index is not None
+
+        load_results = [False, True]
+        with mock.patch.object(FAISSIndexManager, 'load_index_from_git_lfs', autospec=True, side_effect=load) as loader:
+            self.assertFalse(self.service.ensure_faiss_index_loaded('repo', 'index'))
+            self.assertTrue(self.service.ensure_faiss_index_loaded('repo', 'index'))
+            self.assertTrue(self.service.ensure_faiss_index_loaded('repo', 'index'))
+        self.assertEqual(loader.call_count, 2)
@@ -0,0 +1,78 @@
+import os
+import pytest
+import torch
+from recommendations.train import CheckpointSaver
+
+def test_checkpoint_saver_keeps_top_k(tmp_path):
+    saver = CheckpointSaver(keep_top_k=2)
+    weights = torch.zeros(4)
+    paths = []
+    for i, val_loss in enumerate([0.9, 0.7, 0.5, 0.3]):
+        path = str(tmp_path / f'ckpt_{i}.pt')
+        paths.append(path)
+        saver.save({'model_state_dict': {'w': weights}, 'val_loss': val_loss}, path, val_loss)
+        # mutate in place, the queued snapshot must not see this
+        weights.add_(1)
+    saver.wait()
+
+    assert sorted(os.listdir(tmp_path)) == ['ckpt_2.pt', 'ckpt_3.pt']
+    checkpoint = torch.load(paths[3])
+    assert checkpoint['val_loss'] == 0.3
+    assert torch.equal(checkpoint['model_state_dict']['w'], torch.full((4,), 3.0))
+
+def test_checkpoint_saver_same_path_not_removed(tmp_path):
+    saver = CheckpointSaver(keep_top_k=2)
+    path = str(tmp_path / 'ckpt.pt')
+    other = str(tmp_path / 'other.pt')
+    # two saves to one path, then enough others to prune the first entry
+    saver.save({'val_loss': 0.5}, path, 0.5)
+    saver.save({'val_loss': 0.3}, path, 0.3)
+    saver.save({'val_loss': 0.4}, other, 0.4)
+    saver.wait()
+
+    assert sorted(os.listdir(tmp_path)) == ['ckpt.pt', 'other.pt']
+    assert torch.load(path)['val_loss'] == 0.3
+
+def test_embed_pairs_dedupes_users(tmp_path):
+    from torch.utils.data import TensorDataset
+    from recommendations.algorithm import TwinTowerModel
+    from recommendations.train import Trainer
+
+    table = torch.randn(6, 16)
+    rows_a = torch.tensor([0, 1, 2, 0])
+    rows_b = torch.tensor([1, 2, 0, 3])
+    dataset = TensorDataset(rows_a, rows_b, torch.ones(4))
+    dataset.return_indices = True
+    dataset.embeddings = table
+
+    model = TwinTowerModel(input_dim=16, hidden_dims=[8, 4], use_faiss=False)
+    trainer = Trainer(model, dataset, device='cpu', checkpoint_dir=str(tmp_path))
+    model.eval()
+
+    with torch.no_grad():
+        emb1, emb2 = trainer._embed_pairs(rows_a, rows_b, trainer.train_table)
+        ref1, ref2 = model(table[rows_a], table[rows_b])
+    assert torch.allclose(emb1, ref1, atol=1e-6)
+    assert torch.allclose(emb2, ref2, atol=1e-6)
+
+def test_embedding_table_found_through_subset(tmp_path):
+    from torch.utils.data import TensorDataset, random_split
+    from recommendations.algorithm import TwinTowerModel
+    from recommendations.train import Trainer
+
+    table = torch.randn(6, 16)
+    rows_a = torch.tensor([0, 1, 2, 0])
+    rows_b = torch.tensor([1, 2, 0, 3])
+    dataset = TensorDataset(rows_a, rows_b, torch.ones(4))
+    dataset.return_indices = True
+    dataset.embeddings = table
+    train_split, val_split = random_split(dataset, [3, 1])
+
+    model = TwinTowerModel(input_dim=16, hidden_dims=[8, 4], use_faiss=False)
+    trainer = Trainer(model, train_split, val_split, device='cpu', checkpoint_dir=str(tmp_path))
+    assert trainer.train_table is table
+    assert trainer.val_table is table
+
+    # index batches without a table must not be fed to the model as features
+    with pytest.raises(ValueError):
+        trainer._embed_pairs(rows_a, rows_b, None)
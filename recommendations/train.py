@@ -4,13 +4,18 @@ import torch.nn.functional as F
 import torch.optim as optim
 from torch.utils.data import DataLoader
 from torch.optim.lr_scheduler import LinearLR
-from typing import Optional
+from typing import Optional, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
 import os
 import logging
 from datetime import datetime
 from .dataset import CofounderPairDataset, CofounderPairDatasetWithHistory
 from .algorithm import TwinTowerModel, HistoryAwareTwinTowerModel
 
+# Handlers and formatting are left to the host's (e.g. Django's) logging config
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
 class ContrastiveLoss(nn.Module):
     def __init__(self, margin: float = 0.5):
         super().__init__()
@@ -26,6 +31,72 @@ class ContrastiveLoss(nn.Module):
                
         return loss.mean()
 
+def _to_cpu_copy(obj: Any) -> Any:
+    """Recursively copy tensors in a (nested) state dict to CPU"""
+    if torch.is_tensor(obj):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, dict):
+        return {k: _to_cpu_copy(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_to_cpu_copy(v) for v in obj)
+    return obj
+
+def _to_device(t: torch.Tensor, device) -> torch.Tensor:
+    """Move t to device, skipping the dispatch when it is already there"""
+    device = torch.device(device)
+    # 'cuda' (no index) matches tensors already on any current cuda device
+    if t.device == device or (device.index is None and t.device.type == device.type):
+        return t
+    return t.to(device, non_blocking=True)
+
+def _remove_checkpoint(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _embedding_table(dataset) -> Optional[torch.Tensor]:
+    """
+    Return the embedding table of a dataset that yields row indices, looking
+    through Subset wrappers (e.g. from random_split); None if it yields features
+    """
+    while dataset is not None:
+        if getattr(dataset, 'return_indices', False):
+            return dataset.embeddings
+        dataset = getattr(dataset, 'dataset', None)
+    return None
+
+class CheckpointSaver:
+    """
+    Writes checkpoints on a background thread and keeps only the best ones on disk.
+    """
+    def __init__(self, keep_top_k: int = 3):
+        self.keep_top_k = keep_top_k
+        self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._saved: List[Tuple[float, str]] = []  # (val_loss, path), best first
+        self._futures: List[Future] = []
+
+    def save(self, checkpoint: dict, path: str, val_loss: float):
+        # Snapshot on the caller's thread so training can keep mutating the weights
+        state = _to_cpu_copy(checkpoint)
+        self._futures.append(self._io_pool.submit(torch.save, state, path))
+
+        # Saving to a path already kept overwrites that file, so drop its old entry
+        # rather than later removing a file that is still among the best
+        self._saved = [item for item in self._saved if item[1] != path]
+        self._saved.append((val_loss, path))
+        self._saved.sort(key=lambda item: item[0])
+        # Single worker, so removals run after the writes queued before them
+        for _, stale_path in self._saved[self.keep_top_k:]:
+            self._futures.append(self._io_pool.submit(_remove_checkpoint, stale_path))
+        self._saved = self._saved[:self.keep_top_k]
+
+    def wait(self):
+        """Block until all queued writes and removals have finished"""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
 class Trainer:
     def __init__(
         self,
@@ -37,25 +108,37 @@ class Trainer:
         weight_decay: float = 1e-5,
         warmup_steps: int = 1000,
         device: str = 'cuda' if torch.cuda.is_available() else 'cpu',
-        checkpoint_dir: str = 'models'
+        checkpoint_dir: str = 'models',
+        keep_checkpoints: int = 3,
+        mp_context: Optional[str] = None
     ):
         self.model = model.to(device)
         self.device = device
         
+        # Workers are kept alive across epochs; mp_context='spawn' can be used
+        # when the parent has initialized CUDA (fork is the platform default)
         self.train_loader = DataLoader(
             train_dataset,
             batch_size=batch_size,
             shuffle=True,
-            num_workers=4
+            num_workers=4,
+            persistent_workers=True,
+            multiprocessing_context=mp_context
         )
         
         self.val_loader = DataLoader(
             val_dataset,
             batch_size=batch_size,
             shuffle=False,
-            num_workers=4
+            num_workers=4,
+            persistent_workers=True,
+            multiprocessing_context=mp_context
         ) if val_dataset else None
         
+        # Embedding tables for datasets that yield row indices instead of features
+        self.train_table = _embedding_table(train_dataset)
+        self.val_table = _embedding_table(val_dataset)
+        
         self.criterion = ContrastiveLoss()
         
         self.optimizer = optim.AdamW(
@@ -73,25 +156,38 @@ class Trainer:
         
         self.checkpoint_dir = checkpoint_dir
         os.makedirs(checkpoint_dir, exist_ok=True)
+        self.checkpoint_saver = CheckpointSaver(keep_top_k=keep_checkpoints)
         
-        # setup teh logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
+        
+    def _embed_pairs(self, x1: torch.Tensor, x2: torch.Tensor, table: Optional[torch.Tensor]):
+        if table is None:
+            if not torch.is_floating_point(x1):
+                raise ValueError(
+                    "Batch contains row indices but the dataset has no embedding table; "
+                    "use a return_indices=True dataset (optionally wrapped in Subset)"
+                )
+            return self.model(_to_device(x1, self.device), _to_device(x2, self.device))
+        
+        # x1/x2 are rows of the embedding table: run the shared tower once per
+        # unique user in the batch and gather the pair sides back out
+        batch_size = x1.size(0)
+        unique_rows, inverse = torch.unique(torch.cat([x1, x2]), return_inverse=True)
+        embs = self.model.get_embedding(table[unique_rows].to(self.device))
+        inverse = inverse.to(self.device)
+        return embs[inverse[:batch_size]], embs[inverse[batch_size:]]
         
     def train_epoch(self) -> float:
         self.model.train()
         total_loss = 0
         
         for batch_idx, (x1, x2, label) in enumerate(self.train_loader):
-            x1, x2, label = x1.to(self.device), x2.to(self.device), label.to(self.device)
+            label = _to_device(label, self.device)
             
             self.optimizer.zero_grad()
             
             # Forward pass
-            emb1, emb2 = self.model(x1, x2)
+            emb1, emb2 = self._embed_pairs(x1, x2, self.train_table)
             loss = self.criterion(emb1, emb2, label)
             
             # Backward pass
@@ -115,9 +211,9 @@ class Trainer:
         total_loss = 0
         
         for x1, x2, label in self.val_loader:
-            x1, x2, label = x1.to(self.device), x2.to(self.device), label.to(self.device)
+            label = _to_device(label, self.device)
             
-            emb1, emb2 = self.model(x1, x2)
+            emb1, emb2 = self._embed_pairs(x1, x2, self.val_table)
             loss = self.criterion(emb1, emb2, label)
             
             total_loss += loss.item()
@@ -134,32 +230,36 @@ class Trainer:
         }
         
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        path = os.path.join(self.checkpoint_dir, f'twin_tower_{timestamp}.pt')
-        torch.save(checkpoint, path)
-        self.logger.info(f'Saved checkpoint to {path}')
+        path = os.path.join(self.checkpoint_dir, f'twin_tower_{timestamp}_epoch{epoch}.pt')
+        self.checkpoint_saver.save(checkpoint, path, val_loss)
+        self.logger.info(f'Saving checkpoint to {path}')
         
     def train(self, num_epochs: int, early_stopping_patience: int = 5):
         best_val_loss = float('inf')
         patience_counter = 0
         
-        for epoch in range(num_epochs):
-            train_loss = self.train_epoch()
-            val_loss = self.validate()
-            
-            self.logger.info(f'Epoch {epoch + 1}/{num_epochs} - '
-                           f'Train Loss: {train_loss:.4f} - '
-                           f'Val Loss: {val_loss:.4f}')
-            
-            # Early stopping
-            if val_loss < best_val_loss:
-                best_val_loss = val_loss
-                patience_counter = 0
-                self.save_checkpoint(epoch, val_loss)
-            else:
-                patience_counter += 1
-                if patience_counter >= early_stopping_patience:
-                    self.logger.info('Early stopping triggered')
-                    break 
+        try:
+            for epoch in range(num_epochs):
+                train_loss = self.train_epoch()
+                val_loss = self.validate()
+                
+                self.logger.info(f'Epoch {epoch + 1}/{num_epochs} - '
+                               f'Train Loss: {train_loss:.4f} - '
+                               f'Val Loss: {val_loss:.4f}')
+                
+                # Early stopping
+                if val_loss < best_val_loss:
+                    best_val_loss = val_loss
+                    patience_counter = 0
+                    self.save_checkpoint(epoch, val_loss)
+                else:
+                    patience_counter += 1
+                    if patience_counter >= early_stopping_patience:
+                        self.logger.info('Early stopping triggered')
+                        break 
+        finally:
+            # make sure pending checkpoint writes hit the disk
+            self.checkpoint_saver.wait()
                 
 class TrainerWithHistory:
     def __init__(
@@ -172,7 +272,9 @@ class TrainerWithHistory:
         weight_decay: float = 1e-5,
         warmup_steps: int = 1000,
         device: str = 'cuda' if torch.cuda.is_available() else 'cpu',
-        checkpoint_dir: str = 'models'
+        checkpoint_dir: str = 'models',
+        keep_checkpoints: int = 3,
+        mp_context: Optional[str] = None
     ):
         self.model = model.to(device)
         self.device = device
@@ -181,14 +283,18 @@ class TrainerWithHistory:
             train_dataset,
             batch_size=batch_size,
             shuffle=True,
-            num_workers=4
+            num_workers=4,
+            persistent_workers=True,
+            multiprocessing_context=mp_context
         )
 
         self.val_loader = DataLoader(
             val_dataset,
             batch_size=batch_size,
             shuffle=False,
-            num_workers=4
+            num_workers=4,
+            persistent_workers=True,
+            multiprocessing_context=mp_context
         ) if val_dataset else None
 
         self.criterion = ContrastiveLoss()
@@ -197,20 +303,20 @@ class TrainerWithHistory:
 
         self.checkpoint_dir = checkpoint_dir
         os.makedirs(checkpoint_dir, exist_ok=True)
+        self.checkpoint_saver = CheckpointSaver(keep_top_k=keep_checkpoints)
 
-        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-        self.logger = logging.getLogger(__name__)
+        self.logger = logger
 
     def train_epoch(self) -> float:
         self.model.train()
         total_loss = 0
 
         for batch_idx, (a_profile, a_history, b_profile, b_history, label) in enumerate(self.train_loader):
-            a_profile = a_profile.to(self.device)
-            a_history = a_history.to(self.device)
-            b_profile = b_profile.to(self.device)
-            b_history = b_history.to(self.device)
-            label = label.to(self.device)
+            a_profile = _to_device(a_profile, self.device)
+            a_history = _to_device(a_history, self.device)
+            b_profile = _to_device(b_profile, self.device)
+            b_history = _to_device(b_history, self.device)
+            label = _to_device(label, self.device)
 
             self.optimizer.zero_grad()
             emb1, emb2 = self.model(a_profile, a_history, b_profile, b_history)
@@ -234,11 +340,11 @@ class TrainerWithHistory:
         total_loss = 0
 
         for a_profile, a_history, b_profile, b_history, label in self.val_loader:
-            a_profile = a_profile.to(self.device)
-            a_history = a_history.to(self.device)
-            b_profile = b_profile.to(self.device)
-            b_history = b_history.to(self.device)
-            label = label.to(self.device)
+            a_profile = _to_device(a_profile, self.device)
+            a_history = _to_device(a_history, self.device)
+            b_profile = _to_device(b_profile, self.device)
+            b_history = _to_device(b_history, self.device)
+            label = _to_device(label, self.device)
 
             emb1, emb2 = self.model(a_profile, a_history, b_profile, b_history)
             loss = self.criterion(emb1, emb2, label)
@@ -255,25 +361,28 @@ class TrainerWithHistory:
             'val_loss': val_loss
         }
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        path = os.path.join(self.checkpoint_dir, f'history_twin_tower_{timestamp}.pt')
-        torch.save(checkpoint, path)
-        self.logger.info(f'Saved checkpoint to {path}')
+        path = os.path.join(self.checkpoint_dir, f'history_twin_tower_{timestamp}_epoch{epoch}.pt')
+        self.checkpoint_saver.save(checkpoint, path, val_loss)
+        self.logger.info(f'Saving checkpoint to {path}')
 
     def train(self, num_epochs: int, early_stopping_patience: int = 5):
         best_val_loss = float('inf')
         patience_counter = 0
 
-        for epoch in range(num_epochs):
-            train_loss = self.train_epoch()
-            val_loss = self.validate()
-            self.logger.info(f'Epoch {epoch + 1}/{num_epochs} - Train Loss: {train_loss:.4f} - Val Loss: {val_loss:.4f}')
+        try:
+            for epoch in range(num_epochs):
+                train_loss = self.train_epoch()
+                val_loss = self.validate()
+                self.logger.info(f'Epoch {epoch + 1}/{num_epochs} - Train Loss: {train_loss:.4f} - Val Loss: {val_loss:.4f}')
 
-            if val_loss < best_val_loss:
-                best_val_loss = val_loss
-                patience_counter = 0
-                self.save_checkpoint(epoch, val_loss)
-            else:
-                patience_counter += 1
-                if patience_counter >= early_stopping_patience:
-                    self.logger.info('Early stopping triggered')
-                    break
+                if val_loss < best_val_loss:
+                    best_val_loss = val_loss
+                    patience_counter = 0
+                    self.save_checkpoint(epoch, val_loss)
+                else:
+                    patience_counter += 1
+                    if patience_counter >= early_stopping_patience:
+                        self.logger.info('Early stopping triggered')
+                        break
+        finally:
+            self.checkpoint_saver.wait()
@@ -4,12 +4,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from users.serializers import UserProfileSerializer
+from users.utils import ensure_profile
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model
 from .models import Recommendation
 from .serializers import RecommendationSerializer
-from .service import RecommendationService
+from .service import get_service
 from django.conf import settings
 import logging
 import os
@@ -45,10 +46,7 @@ class RecommendationView(APIView):
         Recommend users based on industry, role, location, skills, and goals.
         """
         current_user = request.user
-        if not hasattr(current_user, 'profile'):
-            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        current_profile = current_user.profile
+        current_profile = ensure_profile(current_user)
         users = User.objects.filter(profile__isnull=False).exclude(id=current_user.id)
 
         # 权重设置
@@ -60,6 +58,9 @@ class RecommendationView(APIView):
             'goals': 1,
         }
 
+        # 技能在写入时已规范化, 只需构建一次当前用户的集合
+        skills1 = set(current_profile.skills_list)
+
         recommendations = []
         for user in users:
             profile = user.profile
@@ -78,8 +79,7 @@ class RecommendationView(APIView):
                 score += weights['location']
 
             # 技能 Jaccard 相似度
-            skills1 = set([s.strip().lower() for s in current_profile.skills.split(',') if s.strip()]) if current_profile.skills else set()
-            skills2 = set([s.strip().lower() for s in profile.skills.split(',') if s.strip()]) if profile.skills else set()
+            skills2 = set(profile.skills_list)
             skill_sim = jaccard_similarity(skills1, skills2)
             score += weights['skills'] * skill_sim
 
@@ -116,15 +116,15 @@ class RecommendationViewSet(viewsets.ModelViewSet):
         Get personalized recommendations for the current user
         """
         try:
-            # 初始化服务并加载 FAISS 索引
-            service = RecommendationService()
+            # 获取共享服务, 首次调用时加载 FAISS 索引
+            service = get_service()
             
             # 从 Git LFS 加载索引
             repo_path = getattr(settings, 'FAISS_INDEX_REPO_PATH', os.path.join(settings.BASE_DIR, 'faiss_indices'))
             index_path = getattr(settings, 'FAISS_INDEX_PATH', 'models/faiss_index')
             branch = getattr(settings, 'FAISS_INDEX_BRANCH', 'main')
             
-            success = service.load_faiss_index_from_git_lfs(
+            success = service.ensure_faiss_index_loaded(
                 repo_path=repo_path,
                 index_path=index_path,
                 branch=branch
@@ -156,18 +156,19 @@ class RecommendationViewSet(viewsets.ModelViewSet):
         Trigger recommendation model update and save index to Git LFS
         """
         try:
-            service = RecommendationService()
-            service.update_recommendations()
+            service = get_service()
             
             # 保存更新后的索引到 Git LFS
             repo_path = getattr(settings, 'FAISS_INDEX_REPO_PATH', os.path.join(settings.BASE_DIR, 'faiss_indices'))
             index_path = getattr(settings, 'FAISS_INDEX_PATH', 'models/faiss_index')
             
-            success = service.save_faiss_index_to_git_lfs(
-                repo_path=repo_path,
-                index_path=index_path,
-                commit_message="Update FAISS index with new recommendations"
-            )
+            with service.lock:
+                service.update_recommendations()
+                success = service.save_faiss_index_to_git_lfs(
+                    repo_path=repo_path,
+                    index_path=index_path,
+                    commit_message="Update FAISS index with new recommendations"
+                )
             
             if not success:
                 logger.warning("Failed to save FAISS index to Git LFS")
@@ -190,7 +191,7 @@ class RecommendationViewSet(viewsets.ModelViewSet):
         Get the current status of FAISS index
         """
         try:
-            service = RecommendationService()
+            service = get_service()
             
             # 检查索引是否已加载
             if service.index_manager is None:
@@ -226,18 +227,20 @@ class RecommendationViewSet(viewsets.ModelViewSet):
         Reload FAISS index from Git LFS
         """
         try:
-            service = RecommendationService()
+            service = get_service()
             
             # 从 Git LFS 加载索引
             repo_path = getattr(settings, 'FAISS_INDEX_REPO_PATH', os.path.join(settings.BASE_DIR, 'faiss_indices'))
             index_path = getattr(settings, 'FAISS_INDEX_PATH', 'models/faiss_index')
             branch = getattr(settings, 'FAISS_INDEX_BRANCH', 'main')
             
-            success = service.load_faiss_index_from_git_lfs(
-                repo_path=repo_path,
-                index_path=index_path,
-                branch=branch
-            )
+            # 加锁, 避免并发重载破坏共享索引
+            with service.lock:
+                success = service.load_faiss_index_from_git_lfs(
+                    repo_path=repo_path,
+                    index_path=index_path,
+                    branch=branch
+                )
             
             if success:
                 return Response({
@@ -263,20 +266,23 @@ class RecommendationViewSet(viewsets.ModelViewSet):
         Update FAISS index with current user embeddings
         """
         try:
-            service = RecommendationService()
+            service = get_service()
             
             # 更新索引
-            if service._update_faiss_index():
-                # 保存更新后的索引到 Git LFS
-                repo_path = getattr(settings, 'FAISS_INDEX_REPO_PATH', os.path.join(settings.BASE_DIR, 'faiss_indices'))
-                index_path = getattr(settings, 'FAISS_INDEX_PATH', 'models/faiss_index')
-                
-                success = service.save_faiss_index_to_git_lfs(
-                    repo_path=repo_path,
-                    index_path=index_path,
-                    commit_message="Update FAISS index with new embeddings"
-                )
-                
+            with service.lock:
+                updated = service._update_faiss_index()
+                if updated:
+                    # 保存更新后的索引到 Git LFS
+                    repo_path = getattr(settings, 'FAISS_INDEX_REPO_PATH', os.path.join(settings.BASE_DIR, 'faiss_indices'))
+                    index_path = getattr(settings, 'FAISS_INDEX_PATH', 'models/faiss_index')
+                    
+                    success = service.save_faiss_index_to_git_lfs(
+                        repo_path=repo_path,
+                        index_path=index_path,
+                        commit_message="Update FAISS index with new embeddings"
+                    )
+            
+            if updated:
                 if success:
                     return Response({
                         'status': 'success',
@@ -0,0 +1,56 @@
+"""
+Django settings for running the startup_go test suite.
+
+Extends the regular settings with speed-ups that are only safe for
+throwaway test databases. `manage.py test` and pytest pick this module up
+automatically.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# PBKDF2 is deliberately slow; test users don't need real password hashing
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
+
+
+class DisableMigrations:
+    """
+    Build the test database straight from the current models instead of
+    replaying every app's migration history.
+    """
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+MIGRATION_MODULES = DisableMigrations()
+
+# Keep the test database entirely in RAM; Django's SQLite test runner would
+# already do this for a file-backed NAME, but spell it out so the suite never
+# depends on the local db.sqlite3
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
+}
+
+# Fail any test that lazily loads a relation per row (N+1 queries) when
+# nplusone is installed; it is a dev-only dependency
+try:
+    import nplusone.ext.django  # noqa: F401
+except ImportError:
+    pass
+else:
+    INSTALLED_APPS = [*INSTALLED_APPS, "nplusone.ext.django"]
+    MIDDLEWARE = ["nplusone.ext.django.NPlusOneMiddleware", *MIDDLEWARE]
+    NPLUSONE_RAISE = True
+    NPLUSONE_WHITELIST = [
+        # The JWT authentication class always joins the profile, whether or
+        # not the view ends up reading it
+        {"label": "unused_eager_load", "model": "auth.User", "field": "profile"},
+    ]
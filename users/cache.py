@@ -0,0 +1,30 @@
+import uuid
+
+from django.core.cache import cache
+
+PROFILE_LIST_CACHE_TIMEOUT = 60
+PROFILE_LIST_VERSION_KEY = 'profile_list:version'
+
+
+def profile_list_cache_version():
+    """
+    Return the current version token for cached profile list pages.
+
+    Cached pages embed this token in their key, so changing it retires all of
+    them at once without having to enumerate keys.
+    """
+    version = cache.get(PROFILE_LIST_VERSION_KEY)
+    if version is None:
+        cache.add(PROFILE_LIST_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(PROFILE_LIST_VERSION_KEY)
+    return version
+
+
+def invalidate_profile_list_cache():
+    """
+    Retire every cached profile list page.
+
+    The cache is per process, so other workers may serve their copy until
+    PROFILE_LIST_CACHE_TIMEOUT expires.
+    """
+    cache.set(PROFILE_LIST_VERSION_KEY, uuid.uuid4().hex, None)
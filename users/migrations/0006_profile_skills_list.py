@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-15 09:12
+
+from django.db import migrations, models
+
+
+def populate_skills_list(apps, schema_editor):
+    Profile = apps.get_model("users", "Profile")
+    profiles = list(Profile.objects.exclude(skills="").only("id", "skills"))
+    for profile in profiles:
+        profile.skills_list = [
+            s.strip().lower() for s in profile.skills.split(",") if s.strip()
+        ]
+    Profile.objects.bulk_update(profiles, ["skills_list"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_profile_friends"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="profile",
+            name="skills_list",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(populate_skills_list, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_profile_skills_list'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='industry',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='location',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='role',
+            field=models.CharField(blank=True, db_index=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='startup_stage',
+            field=models.CharField(choices=[('pre_idea', 'Pre-Idea Exploration'), ('ideation', 'Ideation/Concept'), ('prototype', 'Prototype Development'), ('mvp', 'MVP'), ('pre_seed', 'Pre-Seed/Early Traction'), ('seed', 'Seed/Traction'), ('scaling', 'Scaling/Growth'), ('established', 'Established/Post Series-A'), ('expansion', 'Expansion/Post Series-B'), ('pivot', 'Pivot')], db_index=True, default='pre_idea', max_length=50),
+        ),
+    ]
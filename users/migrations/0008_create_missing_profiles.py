@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-15 23:20
+
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Profile = apps.get_model("users", "Profile")
+    missing = User.objects.filter(profile__isnull=True).values_list("id", flat=True)
+    Profile.objects.bulk_create(
+        [Profile(user_id=user_id) for user_id in missing], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0007_profile_filter_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
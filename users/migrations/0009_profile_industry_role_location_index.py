@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-15 23:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_create_missing_profiles'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='industry',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['industry', 'role', 'location'], name='users_profi_industr_71c69e_idx'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from .cache import invalidate_profile_list_cache
 
 class Profile(models.Model):
     """
@@ -24,15 +25,16 @@ class Profile(models.Model):
     bio = models.TextField(max_length=500, blank=True)
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
     industry = models.CharField(max_length=100, blank=True)
-    role = models.CharField(max_length=100, blank=True)
-    location = models.CharField(max_length=100, blank=True)
+    role = models.CharField(max_length=100, blank=True, db_index=True)
+    location = models.CharField(max_length=100, blank=True, db_index=True)
     skills = models.TextField(blank=True)
+    skills_list = models.JSONField(default=list, blank=True, editable=False)  # Normalized skills, derived from skills
     goals = models.TextField(blank=True)
     website = models.URLField(max_length=200, blank=True)
     social_links = models.JSONField(default=dict, blank=True)
     projects = models.JSONField(default=list, blank=True)  # List of project IDs
     experience_years = models.IntegerField(default=0)
-    startup_stage = models.CharField(max_length=50, choices=STAGE_CHOICES, default='pre_idea')
+    startup_stage = models.CharField(max_length=50, choices=STAGE_CHOICES, default='pre_idea', db_index=True)
     seeking_roles = models.JSONField(default=list, blank=True)  # Roles they want in a co-founder
     friends = models.JSONField(default=list, blank=True)  # List of user IDs
     created_at = models.DateTimeField(auto_now_add=True)
@@ -41,6 +43,41 @@ class Profile(models.Model):
     def __str__(self):
         return f"{self.user.username}'s profile"
 
+    @staticmethod
+    def parse_skills(skills):
+        """
+        Split a comma-separated skills string into a list of lowercase skills.
+        """
+        if not skills:
+            return []
+        return [s.strip().lower() for s in skills.split(',') if s.strip()]
+
+    def save(self, *args, **kwargs):
+        """
+        Keep skills_list in sync with skills so readers never re-parse the string.
+
+        Partial saves (update_fields) also write the derived skills_list and
+        the updated_at timestamp, which Django would otherwise leave stale.
+        Partial saves that leave skills alone do not read it, so they work on
+        instances loaded with only() the columns being changed.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            update_fields = set(update_fields) | {'updated_at'}
+            if 'skills' in update_fields:
+                update_fields.add('skills_list')
+            kwargs['update_fields'] = update_fields
+        if not update_fields or 'skills' in update_fields:
+            self.skills_list = self.parse_skills(self.skills)
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            # The most common profile list filter combination; also serves
+            # industry-only filters, so industry has no index of its own
+            models.Index(fields=['industry', 'role', 'location']),
+        ]
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     """
@@ -50,8 +87,21 @@ def create_user_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 @receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
+def save_user_profile(sender, instance, created, update_fields=None, **kwargs):
     """
     Signal to save the profile when the user is saved.
+
+    Skipped for new users (the profile was just inserted above) and for
+    partial saves (update_fields), which only touch User columns.
     """
+    if created or update_fields:
+        return
     instance.profile.save()
+
+@receiver([post_save, post_delete], sender=User)
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_cached_profile_lists(sender, **kwargs):
+    """
+    Signal to drop cached profile list pages when a user or profile changes.
+    """
+    invalidate_profile_list_cache()
@@ -1,7 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
-from django.db import IntegrityError
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.db import IntegrityError, transaction
+from .cache import invalidate_profile_list_cache
 from .models import Profile
 
 class ProfileSerializer(serializers.ModelSerializer):
@@ -10,6 +12,12 @@ class ProfileSerializer(serializers.ModelSerializer):
     """
     friends = serializers.ListField(child=serializers.IntegerField(), read_only=True)
 
+    # Computed once at import instead of on every validation
+    _VALID_STAGES = frozenset(choice[0] for choice in Profile.STAGE_CHOICES)
+    _INVALID_STAGE_MESSAGE = (
+        f"Invalid startup stage. Must be one of: {', '.join(choice[0] for choice in Profile.STAGE_CHOICES)}"
+    )
+
     class Meta:
         model = Profile
         fields = (
@@ -28,22 +36,41 @@ class ProfileSerializer(serializers.ModelSerializer):
             'seeking_roles',
             'friends',
         )
-        extra_kwargs = {
-            'bio': {'required': False},
-            'avatar': {'required': False},
-            'industry': {'required': False},
-            'role': {'required': False},
-            'location': {'required': False},
-            'skills': {'required': False},
-            'goals': {'required': False},
-            'website': {'required': False},
-            'social_links': {'required': False},
-            'projects': {'required': False},
-            'experience_years': {'required': False},
-            'startup_stage': {'required': False},
-            'seeking_roles': {'required': False},
-            # 'friends': {'required': False},
-        }
+        # Every writable field is optional; friends is declared read-only above
+        extra_kwargs = {field: {'required': False} for field in fields if field != 'friends'}
+
+    @classmethod
+    def quick_validate(cls, data):
+        """
+        Pass/fail check of profile data for trusted internal callers.
+
+        Runs each field's own validation (type coercion, max_length, URL...)
+        followed by its validate_<field> hook, on a field graph built once per
+        class, and stops at the first failure without collecting error
+        details. Agrees with is_valid() on partial data; use is_valid() where
+        the errors are needed, e.g. in API responses.
+
+        Returns:
+            bool: True if every known field passes validation
+        """
+        serializer = cls.__dict__.get('_quick_validate_serializer')
+        if serializer is None:
+            # fields is cached on the instance, so the graph is built only once
+            serializer = cls._quick_validate_serializer = cls()
+        fields = serializer.fields
+        for name, value in data.items():
+            field = fields.get(name)
+            if field is None or field.read_only:
+                # is_valid() ignores unknown and read-only input as well
+                continue
+            try:
+                value = field.run_validation(value)
+                validator = getattr(serializer, f'validate_{name}', None)
+                if validator is not None:
+                    validator(value)
+            except serializers.ValidationError:
+                return False
+        return True
 
     def validate_skills(self, value):
         """
@@ -73,9 +100,8 @@ class ProfileSerializer(serializers.ModelSerializer):
         """
         Validate startup_stage field.
         """
-        valid_stages = [choice[0] for choice in Profile.STAGE_CHOICES]
-        if value and value not in valid_stages:
-            raise serializers.ValidationError(f"Invalid startup stage. Must be one of: {', '.join(valid_stages)}")
+        if value and value not in self._VALID_STAGES:
+            raise serializers.ValidationError(self._INVALID_STAGE_MESSAGE)
         return value
 
     def validate_seeking_roles(self, value):
@@ -86,6 +112,73 @@ class ProfileSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Seeking roles must be a list.")
         return value
 
+class ProfileSummarySerializer(serializers.ModelSerializer):
+    """
+    Read-only subset of the profile shown in user listings.
+    """
+
+    class Meta:
+        model = Profile
+        fields = ('avatar', 'industry', 'role', 'location', 'skills', 'startup_stage')
+        read_only_fields = fields
+
+class UserProfileSummarySerializer(serializers.ModelSerializer):
+    """
+    Read-only user plus profile summary for list endpoints.
+
+    Detail endpoints use UserProfileSerializer for the full profile.
+    """
+    profile = ProfileSummarySerializer(read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'email', 'first_name', 'last_name', 'profile')
+        read_only_fields = fields
+
+    @classmethod
+    def value_fields(cls):
+        """
+        Return the column names to pass to QuerySet.values() on a User queryset
+        for serialize_rows().
+        """
+        user_fields = [f for f in cls.Meta.fields if f != 'profile']
+        profile_fields = [f'profile__{f}' for f in ProfileSummarySerializer.Meta.fields]
+        return [*user_fields, *profile_fields]
+
+    @classmethod
+    def serialize_rows(cls, rows):
+        """
+        Build the same output as UserProfileSummarySerializer(users, many=True).data
+        from plain value rows, skipping model instances and per-field serializer calls.
+
+        Args:
+            rows: Dicts from a User queryset's values(*value_fields())
+
+        Returns:
+            list: One dict per user
+        """
+        user_fields = [f for f in cls.Meta.fields if f != 'profile']
+        profile_fields = ProfileSummarySerializer.Meta.fields
+        avatar_storage = Profile._meta.get_field('avatar').storage
+        data = []
+        for row in rows:
+            profile = {f: row[f'profile__{f}'] for f in profile_fields}
+            avatar = profile['avatar']
+            profile['avatar'] = avatar_storage.url(avatar) if avatar else None
+            data.append({**{f: row[f] for f in user_fields}, 'profile': profile})
+        return data
+
+class FriendSummarySerializer(serializers.ModelSerializer):
+    """
+    Read-only display details for a user in friend listings.
+    """
+    avatar = serializers.ImageField(source='profile.avatar', read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'username', 'first_name', 'last_name', 'avatar')
+        read_only_fields = fields
+
 class UserProfileSerializer(serializers.ModelSerializer):
     """
     Serializer for combining User and Profile data.
@@ -111,15 +204,18 @@ class UserProfileSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         
         # Update User fields
-        for attr, value in validated_data.items():
-            setattr(user, attr, value)
-        user.save()
+        if validated_data:
+            for attr, value in validated_data.items():
+                setattr(user, attr, value)
+            user.save(update_fields=list(validated_data.keys()))
         
-        # Update Profile fields
-        profile = user.profile
-        for attr, value in profile_data.items():
-            setattr(profile, attr, value)
-        profile.save()
+        # Update Profile fields; updated_at is bumped on any change because
+        # cached profile representations are keyed on it
+        if validated_data or profile_data:
+            profile = user.profile
+            for attr, value in profile_data.items():
+                setattr(profile, attr, value)
+            profile.save(update_fields=[*profile_data.keys(), 'updated_at'])
         
         return user
 
@@ -129,18 +225,50 @@ class UserProfileSerializer(serializers.ModelSerializer):
         """
         profile_data = validated_data.pop('profile', {})
         # Update User fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        if validated_data:
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save(update_fields=list(validated_data.keys()))
 
-        # Update Profile fields
-        profile = instance.profile
-        for attr, value in profile_data.items():
-            setattr(profile, attr, value)
-        profile.save()
+        # Update Profile fields; updated_at is bumped on any change because
+        # cached profile representations are keyed on it
+        if validated_data or profile_data:
+            profile = instance.profile
+            for attr, value in profile_data.items():
+                setattr(profile, attr, value)
+            profile.save(update_fields=[*profile_data.keys(), 'updated_at'])
 
         return instance
 
+class BulkUserRegistrationSerializer(serializers.ListSerializer):
+    """
+    Registers many users with one INSERT for the users and one for their profiles.
+    """
+
+    def create(self, validated_data):
+        """
+        Create and return the users, bypassing the per-user post_save signal.
+        """
+        users = []
+        for attrs in validated_data:
+            attrs = dict(attrs)
+            attrs.pop('password2')
+            password = attrs.pop('password')
+            attrs['username'] = User.normalize_username(attrs['username'])
+            attrs['email'] = User.objects.normalize_email(attrs.get('email', ''))
+            user = User(**attrs)
+            user.set_password(password)
+            users.append(user)
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create(users)
+                Profile.objects.bulk_create([Profile(user=user) for user in users])
+        except IntegrityError:
+            raise serializers.ValidationError({"username": ["One or more usernames already exist."]})
+        # bulk_create sends no post_save signals
+        invalidate_profile_list_cache()
+        return users
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """
     Serializer for user registration.
@@ -151,14 +279,12 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('username', 'email', 'password', 'password2', 'first_name', 'last_name')
-
-    def validate_username(self, value):
-        """
-        Check if username is already taken.
-        """
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("A user with this username already exists.")
-        return value
+        # Uniqueness is enforced by the database on INSERT (see create), so skip
+        # the UniqueValidator DRF would otherwise add and its extra SELECT.
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+        }
+        list_serializer_class = BulkUserRegistrationSerializer
 
     def validate(self, attrs):
         """
@@ -174,16 +300,12 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         """
         validated_data.pop('password2')
         try:
-            # Create the user
-            user = User.objects.create_user(**validated_data)
-            
-            # Ensure profile exists
-            if not hasattr(user, 'profile'):
-                Profile.objects.create(user=user)
-            
-            return user
+            # The post_save signal inserts the profile in the same transaction;
+            # a duplicate username fails on the unique constraint
+            with transaction.atomic():
+                return User.objects.create_user(**validated_data)
         except IntegrityError:
-            raise serializers.ValidationError({"username": "A user with this username already exists."})
+            raise serializers.ValidationError({"username": ["A user with this username already exists."]})
 
 class UserLoginSerializer(serializers.Serializer):
     """
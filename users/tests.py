@@ -1,18 +1,72 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth.models import User
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Profile
+from .serializers import ProfileSerializer, UserProfileSummarySerializer
+from PIL import Image
+import io
 import json
+import tempfile
+from unittest import mock
+
+class ProfileSerializerTests(SimpleTestCase):
+    def test_quick_validate(self):
+        """
+        Test the pass/fail validation path used by internal callers.
+        """
+        self.assertTrue(ProfileSerializer.quick_validate({
+            'skills': 'Python, Django',
+            'experience_years': 3,
+            'startup_stage': 'mvp',
+            'seeking_roles': ['CTO'],
+        }))
+        self.assertFalse(ProfileSerializer.quick_validate({'skills': 'x' * 1001}))
+        self.assertFalse(ProfileSerializer.quick_validate({'experience_years': -1}))
+        self.assertFalse(ProfileSerializer.quick_validate({'startup_stage': 'unicorn'}))
+        self.assertFalse(ProfileSerializer.quick_validate({'seeking_roles': 'CTO'}))
+
+    def test_quick_validate_matches_is_valid(self):
+        """
+        Test that quick_validate agrees with is_valid() on the same data.
+        """
+        cases = [
+            {'industry': 'x' * 101},
+            {'website': 'nope'},
+            {'website': 'https://example.com'},
+            {'experience_years': '3'},
+            {'experience_years': 'three'},
+            {'experience_years': -1},
+            {'bio': None},
+            {'social_links': {'github': 'https://github.com/me'}},
+            {'friends': 'not a list'},
+            {'unknown': 'ignored'},
+        ]
+        for data in cases:
+            with self.subTest(data=data):
+                self.assertEqual(
+                    ProfileSerializer.quick_validate(data),
+                    ProfileSerializer(data=data, partial=True).is_valid(),
+                )
 
 class UserAPITests(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """
-        Set up test data.
+        Set up test data once for the whole class.
+
+        Each test runs in a transaction that is rolled back, and Django hands
+        every test its own copy of these attributes.
         """
         # Create test user
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123',
@@ -20,26 +74,58 @@ class UserAPITests(TestCase):
             last_name='User'
         )
         # Create another user
-        self.friend = User.objects.create_user(
+        cls.friend = User.objects.create_user(
             username='frienduser',
             email='friend@example.com',
             password='testpass123',
             first_name='Friend',
             last_name='User'
         )
+        # Create a user with a distinct profile for the list filter tests
+        cls.other_user = User.objects.create_user(
+            username='otheruser',
+            email='other@example.com',
+            password='testpass123'
+        )
+        # Update the existing profile (created by signal)
+        cls.other_user.profile.industry = 'Healthcare'
+        cls.other_user.profile.role = 'Doctor'
+        cls.other_user.profile.location = 'Boston, USA'
+        cls.other_user.profile.skills = 'Medicine, Research'
+        cls.other_user.profile.startup_stage = 'ideation'
+        cls.other_user.profile.save()
+        # Minted directly so only the login tests pay for a password check
+        cls.access = str(RefreshToken.for_user(cls.user).access_token)
+        # A 1x1 JPEG built in memory, so no fixture file is read from disk
+        buffer = io.BytesIO()
+        Image.new('RGB', (1, 1)).save(buffer, 'JPEG')
+        cls.avatar_bytes = buffer.getvalue()
+        # Resolve the routes used across tests once
+        cls.REGISTER_URL = reverse('register')
+        cls.BULK_REGISTER_URL = reverse('register-bulk')
+        cls.LOGIN_URL = reverse('login')
+        cls.PROFILE_URL = reverse('profile')
+        cls.PROFILE_LIST_URL = reverse('user-profile-list')
+        cls.ADD_FRIEND_URL = reverse('add-friend')
+        cls.REMOVE_FRIEND_URL = reverse('remove-friend')
+        cls.FRIEND_MATCH_URL = reverse('friend-match')
+
+    def setUp(self):
         self.client = APIClient()
+        # Cached responses would otherwise outlive each test's rolled-back data
+        cache.clear()
 
     def authenticate(self):
-        login_url = reverse('login')
-        login_data = {'username': 'testuser', 'password': 'testpass123'}
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        """
+        Authenticate the client as the test user.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
 
     def test_user_registration(self):
         """
         Test user registration endpoint.
         """
-        url = reverse('register')
+        url = self.REGISTER_URL
         data = {
             'username': 'newuser',
             'email': 'newuser@example.com',
@@ -51,7 +137,8 @@ class UserAPITests(TestCase):
         
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(User.objects.count(), 4)
+        self.assertTrue(Profile.objects.filter(user__username='newuser').exists())
         self.assertEqual(response.data['user']['username'], 'newuser')
         self.assertIn('refresh', response.data)
         self.assertIn('access', response.data)
@@ -60,7 +147,7 @@ class UserAPITests(TestCase):
         """
         Test user registration with duplicate username.
         """
-        url = reverse('register')
+        url = self.REGISTER_URL
         data = {
             'username': 'testuser',
             'email': 'another@example.com',
@@ -72,13 +159,14 @@ class UserAPITests(TestCase):
         
         response = self.client.post(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn('username', response.data)
+        self.assertEqual(response.data['username'], ['A user with this username already exists.'])
+        self.assertEqual(User.objects.filter(username='testuser').count(), 1)
 
     def test_user_registration_password_mismatch(self):
         """
         Test user registration with mismatched passwords.
         """
-        url = reverse('register')
+        url = self.REGISTER_URL
         data = {
             'username': 'newuser',
             'email': 'newuser@example.com',
@@ -92,11 +180,49 @@ class UserAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('password', response.data)
 
+    def test_bulk_user_registration(self):
+        """
+        Test registering several users in one request as an admin.
+        """
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+        self.client.force_authenticate(admin)
+        url = self.BULK_REGISTER_URL
+        data = [
+            {
+                'username': f'bulkuser{i}',
+                'email': f'bulkuser{i}@example.com',
+                'password': 'newpass123',
+                'password2': 'newpass123',
+            }
+            for i in range(3)
+        ]
+
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([u['username'] for u in response.data], ['bulkuser0', 'bulkuser1', 'bulkuser2'])
+        self.assertEqual(Profile.objects.filter(user__username__startswith='bulkuser').count(), 3)
+        self.assertTrue(User.objects.get(username='bulkuser0').check_password('newpass123'))
+
+        # Any existing username rejects the whole batch
+        data[0]['username'] = 'testuser'
+        data[1]['username'] = 'bulkuser9'
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(User.objects.filter(username='bulkuser9').exists())
+
+    def test_bulk_user_registration_requires_admin(self):
+        """
+        Test that bulk registration is not open to regular users.
+        """
+        self.authenticate()
+        response = self.client.post(self.BULK_REGISTER_URL, [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
     def test_user_login(self):
         """
         Test user login endpoint.
         """
-        url = reverse('login')
+        url = self.LOGIN_URL
         data = {
             'username': 'testuser',
             'password': 'testpass123'
@@ -111,7 +237,7 @@ class UserAPITests(TestCase):
         """
         Test user login with invalid credentials.
         """
-        url = reverse('login')
+        url = self.LOGIN_URL
         data = {
             'username': 'testuser',
             'password': 'wrongpass'
@@ -121,12 +247,39 @@ class UserAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertIn('error', response.data)
 
+    def test_user_login_unknown_or_inactive_user(self):
+        """
+        Test that unknown and inactive users get the same error as a wrong password.
+        """
+        response = self.client.post(self.LOGIN_URL, {'username': 'nobody', 'password': 'testpass123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.post(self.LOGIN_URL, {'username': 'testuser', 'password': 'testpass123'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.data, {'error': 'Invalid credentials'})
+
+    def test_user_login_reuses_recent_password_check(self):
+        """
+        Test that a repeated login skips the password hasher until the password changes.
+        """
+        data = {'username': 'testuser', 'password': 'testpass123'}
+        with mock.patch.object(User, 'check_password', autospec=True, side_effect=User.check_password) as check:
+            self.assertEqual(self.client.post(self.LOGIN_URL, data, format='json').status_code, status.HTTP_200_OK)
+            self.assertEqual(self.client.post(self.LOGIN_URL, data, format='json').status_code, status.HTTP_200_OK)
+            self.assertEqual(check.call_count, 1)
+
+        self.user.set_password('newpass123')
+        self.user.save()
+        response = self.client.post(self.LOGIN_URL, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_token_refresh(self):
         """
         Test token refresh endpoint.
         """
         # First login to get refresh token
-        login_url = reverse('login')
+        login_url = self.LOGIN_URL
         login_data = {
             'username': 'testuser',
             'password': 'testpass123'
@@ -147,17 +300,10 @@ class UserAPITests(TestCase):
         """
         Test profile creation endpoint.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
         # Then create profile
-        url = reverse('profile')
+        url = self.PROFILE_URL
         data = {
             'first_name': 'Test',
             'last_name': 'User',
@@ -178,25 +324,60 @@ class UserAPITests(TestCase):
         # Since profile is automatically created by signal, we should use PUT instead of POST
         response = self.client.put(url, data, format='json')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(Profile.objects.count(), 2)
+        self.assertEqual(Profile.objects.count(), 3)
         print(response.data)
         self.assertEqual(response.data['profile']['industry'], 'Technology')
 
+    def test_profile_post_creates_missing_profile_once(self):
+        """
+        Test that POST creates a missing profile and rejects a second attempt.
+        """
+        Profile.objects.filter(user=self.user).delete()
+        self.authenticate()
+        data = {'first_name': 'Test', 'profile': {'industry': 'Technology'}}
+
+        response = self.client.post(self.PROFILE_URL, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['profile']['industry'], 'Technology')
+
+        response = self.client.post(self.PROFILE_URL, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Profile already exists')
+        self.assertEqual(Profile.objects.filter(user=self.user).count(), 1)
+
+    def test_profile_get_creates_missing_profile(self):
+        """
+        Test that GET returns a fresh profile for a user whose profile was deleted.
+        """
+        Profile.objects.filter(user=self.user).delete()
+        self.authenticate()
+
+        response = self.client.get(self.PROFILE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['profile']['industry'], '')
+        self.assertEqual(Profile.objects.filter(user=self.user).count(), 1)
+
+    def test_friend_views_create_missing_profile(self):
+        """
+        Test that the friend endpoints work for a user whose profile was deleted.
+        """
+        Profile.objects.filter(user=self.user).delete()
+        self.authenticate()
+
+        response = self.client.post(self.ADD_FRIEND_URL, {'friend_id': self.friend.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.FRIEND_MATCH_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Profile.objects.get(user=self.user).friends, [self.friend.id])
+
     def test_profile_update(self):
         """
         Test profile update endpoint.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
         # Update profile
-        url = reverse('profile')
+        url = self.PROFILE_URL
         data = {
             'first_name': 'Updated',
             'last_name': 'Name',
@@ -214,22 +395,30 @@ class UserAPITests(TestCase):
         self.assertEqual(response.data['first_name'], 'Updated')
         self.assertEqual(response.data['profile']['industry'], 'FinTech')
 
+    def test_profile_update_profile_fields_only(self):
+        """
+        Test that updating only profile fields issues a single UPDATE.
+        """
+        self.authenticate()
+        url = self.PROFILE_URL
+        data = {'profile': {'industry': 'FinTech'}}
+        # Authentication (user + profile) and one profile UPDATE
+        with self.assertNumQueries(2):
+            response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['first_name'], 'Test')
+        self.assertEqual(response.data['profile']['industry'], 'FinTech')
+
     def test_profile_get(self):
         """
         Test profile retrieval endpoint.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
-        # Get profile
-        url = reverse('profile')
-        response = self.client.get(url)
+        # Get profile; the user and profile are loaded in a single query
+        url = self.PROFILE_URL
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['profile']['industry'], '')  # Profile is created with empty values
         self.assertEqual(response.data['profile']['role'], '')  # Profile is created with empty values
@@ -237,59 +426,67 @@ class UserAPITests(TestCase):
         self.assertEqual(response.data['profile']['skills'], '')  # Profile is created with empty values
         self.assertEqual(response.data['profile']['goals'], '')  # Profile is created with empty values
 
+    def test_profile_get_cached_until_profile_changes(self):
+        """
+        Test that profile reads are cached and invalidated by updates.
+        """
+        self.authenticate()
+        url = self.PROFILE_URL
+        self.client.get(url)
+
+        # Writes that bypass save() don't bump updated_at, so the cached copy is served
+        User.objects.filter(pk=self.user.pk).update(first_name='Stale')
+        response = self.client.get(url)
+        self.assertEqual(response.data['first_name'], 'Test')
+
+        response = self.client.put(url, {'first_name': 'Fresh'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(url)
+        self.assertEqual(response.data['first_name'], 'Fresh')
+
+    def test_validated_token_cached(self):
+        """
+        Test that a token's signature is verified once, while the user is
+        still loaded on every request.
+        """
+        self.authenticate()
+        with mock.patch.object(
+            JWTAuthentication, 'get_validated_token', autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as validate:
+            self.client.get(self.PROFILE_URL)
+            self.client.get(self.PROFILE_URL)
+        self.assertEqual(validate.call_count, 1)
+
+        # Deactivation still applies to the cached token
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        response = self.client.get(self.PROFILE_URL)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
     def test_avatar_upload(self):
         """
         Test avatar upload endpoint.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
         # Upload avatar
         url = reverse('avatar-upload')
-        with open('test_avatar.jpg', 'rb') as avatar:
-            data = {'avatar': avatar}
-            response = self.client.post(url, data, format='multipart')
+        avatar = SimpleUploadedFile('avatar.jpg', self.avatar_bytes, content_type='image/jpeg')
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            self.client.get(self.PROFILE_URL)
+            response = self.client.post(url, {'avatar': avatar}, format='multipart')
             self.assertEqual(response.status_code, status.HTTP_200_OK)
             self.assertIn('avatar', response.data)
 
-    def test_unauthorized_profile_access(self):
-        """
-        Test unauthorized access to profile endpoints.
-        """
-        # Try to access profile without authentication
-        url = reverse('profile')
-        response = self.client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-        
-        # Try to update profile without authentication
-        data = {
-            'first_name': 'Test',
-            'last_name': 'User',
-            'profile': {
-                'industry': 'Technology'
-            }
-        }
-        response = self.client.put(url, data, format='json')
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            # The new avatar shows up in (previously cached) profile reads
+            profile_response = self.client.get(self.PROFILE_URL)
+            self.assertEqual(profile_response.data['profile']['avatar'], response.data['avatar'])
 
     def test_invalid_team_size(self):
         """
         Test creating project with invalid team size.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
         url = reverse('project-list')
         data = {
@@ -310,18 +507,13 @@ class UserAPITests(TestCase):
         """
         Test getting a user's profile by username.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
-        # Get profile by username
+        # Get profile by username: one query authenticates, one loads the user
+        # joined with the profile
         url = reverse('user-profile', args=['testuser'])
-        response = self.client.get(url)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['username'], 'testuser')
         self.assertEqual(response.data['profile']['industry'], '')
@@ -332,14 +524,7 @@ class UserAPITests(TestCase):
         """
         Test getting profile for a non-existent user.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
         # Try to get profile for non-existent user
         url = reverse('user-profile', args=['nonexistentuser'])
@@ -347,138 +532,173 @@ class UserAPITests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data['error'], 'User not found')
 
-    def test_get_user_profile_unauthorized(self):
-        """
-        Test getting user profile without authentication.
-        """
-        # Create a new client without authentication
-        client = APIClient()
-        
-        # Try to get profile without authentication
-        url = reverse('user-profile', args=['testuser'])
-        response = client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
-
     def test_get_user_profile_list(self):
         """
         Test getting list of all user profiles.
         """
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.authenticate()
         
-        # Get all profiles
-        url = reverse('user-profile-list')
-        response = self.client.get(url)
+        # Get all profiles: one query authenticates, one counts, one loads the
+        # page of users with profiles
+        url = self.PROFILE_LIST_URL
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)  # Two users in test setup
+        self.assertEqual(response.data['count'], 3)  # Three users in test setup
+        self.assertEqual(len(response.data['results']), 3)
+        # Listings carry a profile summary; details stay on the profile endpoints
+        self.assertEqual(
+            set(response.data['results'][0]['profile']),
+            {'avatar', 'industry', 'role', 'location', 'skills', 'startup_stage'},
+        )
+
+    def test_profile_summary_rows_match_serializer(self):
+        """
+        Test that the row-based list serialization matches the serializer output.
+        """
+        self.other_user.profile.avatar = 'avatars/other.jpg'
+        self.other_user.profile.save()
+        users = User.objects.order_by('id')
+        rows = users.values(*UserProfileSummarySerializer.value_fields())
+        self.assertEqual(
+            UserProfileSummarySerializer.serialize_rows(rows),
+            UserProfileSummarySerializer(users, many=True).data,
+        )
+
+    def test_get_user_profile_list_cached(self):
+        """
+        Test that repeated list requests are served from the cache until a profile changes.
+        """
+        self.authenticate()
+        params = {'industry': 'Healthcare'}
+        self.client.get(self.PROFILE_LIST_URL, params)
+
+        # Only the authentication query remains
+        with self.assertNumQueries(1):
+            response = self.client.get(self.PROFILE_LIST_URL, params)
+        self.assertEqual(response.data['count'], 1)
+
+        self.user.profile.industry = 'Healthcare'
+        self.user.profile.save()
+        response = self.client.get(self.PROFILE_LIST_URL, params)
+        self.assertEqual(response.data['count'], 2)
+
+    def test_get_user_profile_list_cache_keeps_scheme(self):
+        """
+        Test that a page cached from an http request is not served to https clients.
+        """
+        self.authenticate()
+        params = {'page_size': 1}
+        response = self.client.get(self.PROFILE_LIST_URL, params)
+        self.assertTrue(response.data['next'].startswith('http://'))
+
+        response = self.client.get(self.PROFILE_LIST_URL, params, secure=True)
+        self.assertTrue(response.data['next'].startswith('https://'))
+
+    def test_get_user_profile_list_paginated(self):
+        """
+        Test that the profile list is split into pages in a stable order.
+        """
+        self.authenticate()
+        response = self.client.get(self.PROFILE_LIST_URL, {'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [u['username'] for u in response.data['results']], ['testuser', 'frienduser']
+        )
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([u['username'] for u in response.data['results']], ['otheruser'])
+        self.assertIsNone(response.data['next'])
 
     def test_get_user_profile_list_with_filters(self):
         """
         Test getting filtered list of user profiles.
         """
-        # Create another user with different profile
-        other_user = User.objects.create_user(
-            username='otheruser',
-            email='other@example.com',
-            password='testpass123'
-        )
-        
-        # Update the existing profile (created by signal)
-        other_user.profile.industry = 'Healthcare'
-        other_user.profile.role = 'Doctor'
-        other_user.profile.location = 'Boston, USA'
-        other_user.profile.skills = 'Medicine, Research'
-        other_user.profile.startup_stage = 'ideation'
-        other_user.profile.save()
-        
-        # First login to get token
-        login_url = reverse('login')
-        login_data = {
-            'username': 'testuser',
-            'password': 'testpass123'
-        }
-        login_response = self.client.post(login_url, login_data, format='json')
-        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
-        
-        # Test filtering by industry
-        url = reverse('user-profile-list')
-        response = self.client.get(url, {'industry': 'Healthcare'})
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['profile']['industry'], 'Healthcare')
-        
-        # Test filtering by role
-        response = self.client.get(url, {'role': 'Doctor'})
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['profile']['role'], 'Doctor')
-        
-        # Test filtering by location
-        response = self.client.get(url, {'location': 'Boston, USA'})
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['profile']['location'], 'Boston, USA')
-        
-        # Test filtering by skills
-        response = self.client.get(url, {'skills': 'Medicine'})
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['username'], 'otheruser')
-        
-        # Test filtering by startup stage
-        response = self.client.get(url, {'startup_stage': 'ideation'})
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['username'], 'otheruser')
-        
-        # Test multiple filters
-        response = self.client.get(url, {
-            'industry': 'Healthcare',
-            'role': 'Doctor',
-            'location': 'Boston, USA'
-        })
-        self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['username'], 'otheruser')
+        self.authenticate()
+        url = self.PROFILE_LIST_URL
+        cases = [
+            {'industry': 'Healthcare'},
+            {'role': 'Doctor'},
+            {'location': 'Boston, USA'},
+            {'skills': 'Medicine'},
+            {'skills': 'research, MEDICINE'},
+            {'startup_stage': 'ideation'},
+            # Multiple filters combine
+            {'industry': 'Healthcare', 'role': 'Doctor', 'location': 'Boston, USA'},
+        ]
+        for params in cases:
+            with self.subTest(**params), self.assertNumQueries(3):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data['count'], 1)
+                self.assertEqual(response.data['results'][0]['username'], 'otheruser')
 
-    def test_get_user_profile_list_unauthorized(self):
+        # Skills match whole entries only, and every listed skill must be present
+        for skills in ('Med', 'Medicine, Python'):
+            with self.subTest(skills=skills):
+                response = self.client.get(url, {'skills': skills})
+                self.assertEqual(response.data['results'], [])
+
+    def test_profile_skills_list_normalized(self):
         """
-        Test getting user profile list without authentication.
+        Test that skills are normalized into skills_list on save.
         """
-        # Create a new client without authentication
-        client = APIClient()
-        
-        # Try to get profile list without authentication
-        url = reverse('user-profile-list')
-        response = client.get(url)
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        profile = self.user.profile
+        profile.skills = ' Python, Django ,, React '
+        profile.save()
+        profile.refresh_from_db()
+        self.assertEqual(profile.skills_list, ['python', 'django', 'react'])
+
+        profile.skills = 'Go'
+        profile.save(update_fields=['skills'])
+        profile.refresh_from_db()
+        self.assertEqual(profile.skills_list, ['go'])
 
     def test_add_friend_success(self):
         self.authenticate()
-        url = reverse('add-friend')
+        url = self.ADD_FRIEND_URL
         response = self.client.post(url, {'friend_id': self.friend.id}, format='json')
         self.assertEqual(response.status_code, 200)
         self.user.profile.refresh_from_db()
         self.assertIn(self.friend.id, self.user.profile.friends)
 
+    def test_add_friend_writes_only_friends(self):
+        """
+        Test that adding a friend reads and updates just the friends list and
+        refreshes cached profile reads.
+        """
+        self.authenticate()
+        self.client.get(self.PROFILE_URL)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(self.ADD_FRIEND_URL, {'friend_id': self.friend.id}, format='json')
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"friends"', updates[0])
+        self.assertNotIn('"bio"', updates[0])
+        # The friends check reads no other profile columns
+        profile_reads = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('SELECT') and 'FROM "users_profile"' in q['sql']
+        ]
+        self.assertEqual(len(profile_reads), 1)
+        self.assertNotIn('"bio"', profile_reads[0])
+
+        response = self.client.get(self.PROFILE_URL)
+        self.assertEqual(response.data['profile']['friends'], [self.friend.id])
+
     def test_add_friend_already_friend(self):
         self.authenticate()
         self.user.profile.friends.append(self.friend.id)
         self.user.profile.save()
-        url = reverse('add-friend')
+        url = self.ADD_FRIEND_URL
         response = self.client.post(url, {'friend_id': self.friend.id}, format='json')
         self.assertEqual(response.status_code, 400)
         self.assertIn('Already friends', response.data['error'])
 
     def test_add_friend_nonexistent(self):
         self.authenticate()
-        url = reverse('add-friend')
+        url = self.ADD_FRIEND_URL
         response = self.client.post(url, {'friend_id': 99999}, format='json')
         self.assertEqual(response.status_code, 404)
         self.assertIn('User not found', response.data['error'])
@@ -487,33 +707,61 @@ class UserAPITests(TestCase):
         self.authenticate()
         self.user.profile.friends.append(self.friend.id)
         self.user.profile.save()
-        url = reverse('remove-friend')
+        url = self.REMOVE_FRIEND_URL
         response = self.client.post(url, {'friend_id': self.friend.id}, format='json')
         self.assertEqual(response.status_code, 200)
         self.user.profile.refresh_from_db()
         self.assertNotIn(self.friend.id, self.user.profile.friends)
 
+    def test_remove_friend_string_id(self):
+        """
+        Test that a numeric string friend_id matches the integer in the friends list.
+        """
+        self.authenticate()
+        self.user.profile.friends.append(self.friend.id)
+        self.user.profile.save()
+        response = self.client.post(self.REMOVE_FRIEND_URL, {'friend_id': str(self.friend.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.friends, [])
+
+    def test_friend_id_validation(self):
+        """
+        Test that missing or non-integer friend_id is rejected before any lookup.
+        """
+        self.authenticate()
+        cases = [
+            ({}, 'friend_id is required'),
+            ({'friend_id': 'abc'}, 'friend_id must be an integer'),
+        ]
+        for url in (self.ADD_FRIEND_URL, self.REMOVE_FRIEND_URL):
+            for data, error in cases:
+                with self.subTest(url=url, data=data), self.assertNumQueries(1):
+                    response = self.client.post(url, data, format='json')
+                    self.assertEqual(response.status_code, 400)
+                    self.assertEqual(response.data, {'error': error})
+
     def test_remove_friend_not_in_list(self):
         self.authenticate()
-        url = reverse('remove-friend')
+        url = self.REMOVE_FRIEND_URL
         response = self.client.post(url, {'friend_id': self.friend.id}, format='json')
         self.assertEqual(response.status_code, 400)
         self.assertIn('not in your friends list', response.data['error'])
 
     def test_remove_friend_nonexistent(self):
         self.authenticate()
-        url = reverse('remove-friend')
+        url = self.REMOVE_FRIEND_URL
         response = self.client.post(url, {'friend_id': 99999}, format='json')
         self.assertEqual(response.status_code, 400)
         self.assertIn('not in your friends list', response.data['error'])
 
     def test_add_friend_unauthorized(self):
-        url = reverse('add-friend')
+        url = self.ADD_FRIEND_URL
         response = self.client.post(url, {'friend_id': self.friend.id}, format='json')
         self.assertEqual(response.status_code, 401)
 
     def test_remove_friend_unauthorized(self):
-        url = reverse('remove-friend')
+        url = self.REMOVE_FRIEND_URL
         response = self.client.post(url, {'friend_id': self.friend.id}, format='json')
         self.assertEqual(response.status_code, 401)
 
@@ -524,23 +772,81 @@ class UserAPITests(TestCase):
         self.user.profile.save()
         self.friend.profile.friends.append(self.user.id)
         self.friend.profile.save()
-        url = reverse('friend-match')
-        response = self.client.get(url)
+        # One-way friend, and an id whose user no longer exists
+        self.user.profile.friends.extend([self.other_user.id, 9999])
+        self.user.profile.save()
+        url = self.FRIEND_MATCH_URL
+        # Authenticating, one query for all friends' lists, one for details
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertIn(self.friend.id, response.data['mutual_friends'])
+        self.assertEqual(response.data['mutual_friends'], [{
+            'id': self.friend.id,
+            'username': 'frienduser',
+            'first_name': 'Friend',
+            'last_name': 'User',
+            'avatar': None,
+        }])
 
     def test_friend_match_no_mutual(self):
         self.authenticate()
         # Only one-way friendship
         self.user.profile.friends.append(self.friend.id)
         self.user.profile.save()
-        url = reverse('friend-match')
+        url = self.FRIEND_MATCH_URL
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertNotIn(self.friend.id, response.data['mutual_friends'])
         self.assertEqual(response.data['mutual_friends'], [])
 
     def test_friend_match_unauthorized(self):
-        url = reverse('friend-match')
+        url = self.FRIEND_MATCH_URL
         response = self.client.get(url)
         self.assertEqual(response.status_code, 401)
+
+
+class UnauthenticatedAPITests(SimpleTestCase):
+    """
+    Requests without credentials are rejected before any database access,
+    so these tests skip the per-test transaction of TestCase.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_unauthorized_profile_access(self):
+        """
+        Test unauthorized access to profile endpoints.
+        """
+        # Try to access profile without authentication
+        url = reverse('profile')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        # Try to update profile without authentication
+        data = {
+            'first_name': 'Test',
+            'last_name': 'User',
+            'profile': {
+                'industry': 'Technology'
+            }
+        }
+        response = self.client.put(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_user_profile_unauthorized(self):
+        """
+        Test getting user profile without authentication.
+        """
+        # Try to get profile without authentication
+        url = reverse('user-profile', args=['testuser'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_get_user_profile_list_unauthorized(self):
+        """
+        Test getting user profile list without authentication.
+        """
+        # Try to get profile list without authentication
+        url = reverse('user-profile-list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
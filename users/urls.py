@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     UserRegistrationView,
+    UserBulkRegistrationView,
     UserLoginView,
     ProfileView,
     AvatarUploadView,
@@ -15,6 +16,7 @@ urlpatterns = [
     # User registration endpoint
    
     path('register/', UserRegistrationView.as_view(), name='register'),
+    path('register/bulk/', UserBulkRegistrationView.as_view(), name='register-bulk'),
     
     # User login endpoint
     
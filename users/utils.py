@@ -0,0 +1,22 @@
+from .models import Profile
+
+
+def ensure_profile(user):
+    """
+    Return the user's profile, creating it if it is missing.
+
+    The profile is usually already loaded (the JWT authentication class joins
+    it), in which case no query is made. Otherwise get_or_create relies on the
+    unique user column, so concurrent callers cannot create two profiles.
+
+    Args:
+        user: The user whose profile to return
+
+    Returns:
+        Profile: The user's profile
+    """
+    try:
+        return user.profile
+    except Profile.DoesNotExist:
+        profile, _ = Profile.objects.get_or_create(user=user)
+        return profile
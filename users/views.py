@@ -1,23 +1,87 @@
+import hashlib
+import json
+from urllib.parse import urlencode
+
 from django.shortcuts import render
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import IntegerField
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny, IsAuthenticated
-from django.contrib.auth import authenticate
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import (
     UserRegistrationSerializer, 
     UserLoginSerializer,
     UserProfileSerializer,
+    UserProfileSummarySerializer,
+    FriendSummarySerializer,
     ProfileSerializer
 )
+from .cache import PROFILE_LIST_CACHE_TIMEOUT, profile_list_cache_version
 from .models import Profile
+from .utils import ensure_profile
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.crypto import salted_hmac
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.generics import get_object_or_404
+from rest_framework.pagination import PageNumberPagination
 
 # Create your views here.
 
+PROFILE_CACHE_TIMEOUT = 60 * 5
+LOGIN_CACHE_TIMEOUT = 60
+
+def check_login_password(user, password):
+    """
+    Check a login password, remembering a successful check briefly.
+
+    The password hasher is deliberately slow, so clients that log in
+    repeatedly reuse a recent successful check. The cache key is an HMAC
+    (keyed with SECRET_KEY) of the submitted password and the stored hash, so
+    no plaintext is cached and a password change invalidates it at once.
+    Failed checks are never cached and always pay the full hashing cost.
+    """
+    key = 'login:' + salted_hmac('users.login', f'{user.pk}:{user.password}:{password}').hexdigest()
+    if cache.get(key):
+        return True
+    if user.check_password(password):
+        cache.set(key, True, LOGIN_CACHE_TIMEOUT)
+        return True
+    return False
+
+def issue_tokens(user):
+    """
+    Issue a refresh/access token pair for a user.
+
+    SimpleJWT keeps a single module-level token backend with the prepared
+    signing key cached on it, so the key is not re-parsed per call.
+    """
+    refresh = RefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+def serialize_user_profile(user):
+    """
+    Serialize a user with their profile, reusing a cached copy while the
+    profile is unchanged.
+
+    The cache key includes profile.updated_at, so any profile save makes
+    the old entry unreachable. A missing profile is created first.
+    """
+    profile = ensure_profile(user)
+    key = f'user_profile:{user.pk}:{profile.updated_at.timestamp()}'
+    data = cache.get(key)
+    if data is None:
+        data = UserProfileSerializer(user).data
+        cache.set(key, data, PROFILE_CACHE_TIMEOUT)
+    return data
+
 class UserRegistrationView(APIView):
     """
     API endpoint for user registration.
@@ -62,12 +126,12 @@ class UserRegistrationView(APIView):
         if serializer.is_valid():
             try:
                 user = serializer.save()
-                refresh = RefreshToken.for_user(user)
                 return Response({
                     'user': serializer.data,
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
+                    **issue_tokens(user),
                 }, status=status.HTTP_201_CREATED)
+            except ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
             except Exception as e:
                 return Response(
                     {'error': str(e)},
@@ -75,6 +139,45 @@ class UserRegistrationView(APIView):
                 )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class UserBulkRegistrationView(APIView):
+    """
+    API endpoint for registering many users in one request.
+
+    Intended for provisioning scripts, so it is restricted to admin users and
+    does not issue tokens. Users and their profiles are each inserted with a
+    single query.
+
+    Sample API Request:
+    POST /api/users/register/bulk/
+    [
+        {
+            "username": "alice",
+            "email": "alice@example.com",
+            "password": "your_password",
+            "password2": "your_password"
+        },
+        ...
+    ]
+
+    Sample API Response (201 Created):
+    [
+        {
+            "username": "alice",
+            "email": "alice@example.com",
+            "first_name": "",
+            "last_name": ""
+        },
+        ...
+    ]
+    """
+    permission_classes = (IsAdminUser,)
+
+    def post(self, request):
+        serializer = UserRegistrationSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 class UserLoginView(APIView):
     """
     API endpoint for user login.
@@ -105,16 +208,19 @@ class UserLoginView(APIView):
 
         serializer = UserLoginSerializer(data=request.data)
         if serializer.is_valid():
-            user = authenticate(
-                username=serializer.validated_data['username'],
-                password=serializer.validated_data['password']
-            )
-            if user:
-                refresh = RefreshToken.for_user(user)
-                return Response({
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                })
+            password = serializer.validated_data['password']
+            # Only the default ModelBackend is configured, so check the password
+            # directly, loading just the columns the check and the token need
+            try:
+                user = User.objects.only('id', 'password', 'is_active').get(
+                    username=serializer.validated_data['username']
+                )
+            except User.DoesNotExist:
+                # Hash anyway so unknown usernames take as long as wrong passwords
+                User().set_password(password)
+            else:
+                if user.is_active and check_login_password(user, password):
+                    return Response(issue_tokens(user))
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -146,12 +252,7 @@ class ProfileView(APIView):
                 - Contact info (location, website)
                 - Social links and projects
         """
-        # Ensure profile exists
-        if not hasattr(request.user, 'profile'):
-            Profile.objects.create(user=request.user)
-            
-        serializer = UserProfileSerializer(request.user)
-        return Response(serializer.data)
+        return Response(serialize_user_profile(request.user))
 
     def post(self, request):
         """
@@ -167,17 +268,14 @@ class ProfileView(APIView):
             This endpoint is typically called after user registration
             to initialize the profile with additional information.
         """
-        # Check if profile already exists
-        if hasattr(request.user, 'profile'):
+        # Create the profile unless it already exists, in one race-free step
+        _, created = Profile.objects.get_or_create(user=request.user)
+        if not created:
             return Response(
                 {'error': 'Profile already exists'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create profile if it doesn't exist
-        if not hasattr(request.user, 'profile'):
-            Profile.objects.create(user=request.user)
-
         serializer = UserProfileSerializer(data=request.data, context={'request': request})
         if serializer.is_valid():
             try:
@@ -209,10 +307,7 @@ class ProfileView(APIView):
             - industry: "This field is required" (if required=True)
             - role: "This field is required" (if required=True)
         """
-        # Ensure profile exists
-        if not hasattr(request.user, 'profile'):
-            Profile.objects.create(user=request.user)
-
+        ensure_profile(request.user)
         serializer = UserProfileSerializer(request.user, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid():
             try:
@@ -245,19 +340,17 @@ class AvatarUploadView(APIView):
             - "No avatar file provided"
             - "Invalid file type" (if file validation is added)
         """
-        # Ensure profile exists
-        if not hasattr(request.user, 'profile'):
-            Profile.objects.create(user=request.user)
-
         if 'avatar' not in request.FILES:
             return Response(
                 {'error': 'No avatar file provided'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        profile = request.user.profile
+        # The storage writes the upload in chunks (large uploads are already
+        # spooled to a temp file and moved), and only the avatar column is updated
+        profile = ensure_profile(request.user)
         profile.avatar = request.FILES['avatar']
-        profile.save()
+        profile.save(update_fields=['avatar'])
 
         return Response({
             'avatar': profile.avatar.url
@@ -282,28 +375,30 @@ class UserProfileView(APIView):
             
         Possible errors:
             - "User not found" (404)
-            - "Profile not found" (404)
         """
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
+        user = User.objects.select_related('profile').filter(username=username).first()
+        if user is None:
             return Response(
                 {'error': 'User not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Ensure profile exists
-        if not hasattr(user, 'profile'):
-            Profile.objects.create(user=user)
-            
-        serializer = UserProfileSerializer(user)
-        return Response(serializer.data)
+        return Response(serialize_user_profile(user))
+
+class ProfileListPagination(PageNumberPagination):
+    """
+    Page size for the user profile list; clients may ask for up to 100 per page.
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 class UserProfileListView(APIView):
     """
     API endpoint for listing all user profiles.
     """
     permission_classes = (IsAuthenticated,)
+    pagination_class = ProfileListPagination
 
     def get(self, request):
         """
@@ -313,17 +408,37 @@ class UserProfileListView(APIView):
             request: The HTTP request
             
         Returns:
-            Response: List of user profiles
+            Response: A page of user profile summaries (count, next, previous, results)
             
         Query Parameters:
+            - page: Page number (default 1)
+            - page_size: Profiles per page (default 25, at most 100)
             - industry: Filter by industry
             - role: Filter by role
             - location: Filter by location
             - skills: Filter by skills (comma-separated)
             - startup_stage: Filter by startup stage
         """
-        # Get all users with profiles
-        users = User.objects.filter(profile__isnull=False)
+        # Serve a recent identical request from the cache; any user or profile
+        # change moves the cache version (see users.cache). The key covers the
+        # scheme and host because the cached next/previous links are absolute
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        cache_key = 'profile_list:{}:{}'.format(
+            profile_list_cache_version(),
+            hashlib.md5(request.build_absolute_uri(f'{request.path}?{params}').encode()).hexdigest(),
+        )
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+
+        # Get all users with profiles as plain rows of just the columns the
+        # summary shows, joined with the profile in the same query; pages need
+        # a stable order
+        users = (
+            User.objects.filter(profile__isnull=False)
+            .values(*UserProfileSummarySerializer.value_fields())
+            .order_by('id')
+        )
         
         # Apply filters if provided
         industry = request.query_params.get('industry')
@@ -338,19 +453,46 @@ class UserProfileListView(APIView):
         if location:
             users = users.filter(profile__location=location)
             
-        skills = request.query_params.get('skills')
+        skills = Profile.parse_skills(request.query_params.get('skills'))
         if skills:
-            skills_list = [skill.strip() for skill in skills.split(',')]
-            for skill in skills_list:
-                users = users.filter(profile__skills__icontains=skill)
+            # Match whole skills against the normalized skills_list, all in one
+            # condition where the database supports JSON containment
+            if connection.features.supports_json_field_contains:
+                users = users.filter(profile__skills_list__contains=skills)
+            else:
+                # SQLite: look for each quoted skill in the stored JSON array
+                users = users.filter(*[
+                    Q(profile__skills_list__icontains=json.dumps(skill)) for skill in skills
+                ])
                 
         startup_stage = request.query_params.get('startup_stage')
         if startup_stage:
             users = users.filter(profile__startup_stage=startup_stage)
         
-        # Serialize the results
-        serializer = UserProfileSerializer(users, many=True)
-        return Response(serializer.data)
+        # Serialize only the requested page
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(users, request, view=self)
+        response = paginator.get_paginated_response(UserProfileSummarySerializer.serialize_rows(page))
+        cache.set(cache_key, response.data, PROFILE_LIST_CACHE_TIMEOUT)
+        return response
+
+def get_friend_id(request):
+    """
+    Return the friend_id from the request body as an integer.
+
+    Friends lists hold integer user IDs, so string IDs are converted before
+    any lookup or membership check.
+
+    Raises:
+        ValidationError: If friend_id is missing or not an integer
+    """
+    friend_id = request.data.get('friend_id')
+    if friend_id is None or friend_id == '':
+        raise ValidationError({'error': 'friend_id is required'})
+    try:
+        return IntegerField().to_internal_value(friend_id)
+    except ValidationError:
+        raise ValidationError({'error': 'friend_id must be an integer'})
 
 class AddFriendView(APIView):
     """
@@ -359,18 +501,19 @@ class AddFriendView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        friend_id = request.data.get('friend_id')
-        if not friend_id:
-            return Response({'error': 'friend_id is required'}, status=status.HTTP_400_BAD_REQUEST)
-        try:
-            friend = User.objects.get(id=friend_id)
-        except User.DoesNotExist:
+        friend_id = get_friend_id(request)
+        friend = User.objects.filter(id=friend_id).only('id', 'username').first()
+        if friend is None:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-        profile = request.user.profile
-        if friend.id in profile.friends:
-            return Response({'error': 'Already friends'}, status=status.HTTP_400_BAD_REQUEST)
-        profile.friends.append(friend.id)
-        profile.save()
+        ensure_profile(request.user)
+        # Lock the profile row so concurrent friend changes cannot overwrite
+        # each other; read and write back only the friends list
+        with transaction.atomic():
+            profile = Profile.objects.select_for_update().only('id', 'friends').get(user=request.user)
+            if friend.id in profile.friends:
+                return Response({'error': 'Already friends'}, status=status.HTTP_400_BAD_REQUEST)
+            profile.friends.append(friend.id)
+            profile.save(update_fields=['friends'])
         return Response({'success': f'User {friend.username} added as a friend.'}, status=status.HTTP_200_OK)
 
 class RemoveFriendView(APIView):
@@ -380,14 +523,14 @@ class RemoveFriendView(APIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request):
-        friend_id = request.data.get('friend_id')
-        if not friend_id:
-            return Response({'error': 'friend_id is required'}, status=status.HTTP_400_BAD_REQUEST)
-        profile = request.user.profile
-        if friend_id not in profile.friends:
-            return Response({'error': 'User is not in your friends list'}, status=status.HTTP_400_BAD_REQUEST)
-        profile.friends.remove(friend_id)
-        profile.save()
+        friend_id = get_friend_id(request)
+        ensure_profile(request.user)
+        with transaction.atomic():
+            profile = Profile.objects.select_for_update().only('id', 'friends').get(user=request.user)
+            if friend_id not in profile.friends:
+                return Response({'error': 'User is not in your friends list'}, status=status.HTTP_400_BAD_REQUEST)
+            profile.friends.remove(friend_id)
+            profile.save(update_fields=['friends'])
         return Response({'success': f'User {friend_id} removed from friends.'}, status=status.HTTP_200_OK)
 
 class FriendMatchView(APIView):
@@ -399,14 +542,34 @@ class FriendMatchView(APIView):
     def get(self, request):
         user = request.user
         user_id = user.id
-        profile = user.profile
+        profile = ensure_profile(user)
         friends_ids = profile.friends
+        friend_profiles = Profile.objects.filter(user_id__in=friends_ids)
+        if connection.features.supports_json_field_contains:
+            # Let the database test membership and return only the matches
+            matches = set(
+                friend_profiles.filter(friends__contains=[user_id]).values_list('user_id', flat=True)
+            )
+        else:
+            # SQLite has no JSON containment lookup; fetch every friend's friend
+            # list in one query instead
+            matches = {
+                fid for fid, friends in friend_profiles.values_list('user_id', 'friends')
+                if user_id in friends
+            }
+        mutual_ids = [fid for fid in friends_ids if fid in matches]
+
+        # Load display details for the mutual friends only, in one query
         mutual_friends = []
-        for fid in friends_ids:
-            try:
-                friend_profile = Profile.objects.get(user_id=fid)
-                if user_id in friend_profile.friends:
-                    mutual_friends.append(fid)
-            except Profile.DoesNotExist:
-                continue
-        return Response({'mutual_friends': mutual_friends}, status=status.HTTP_200_OK)
+        if mutual_ids:
+            users = (
+                User.objects.select_related('profile')
+                .filter(id__in=mutual_ids)
+                .only('id', 'username', 'first_name', 'last_name', 'profile__avatar')
+            )
+            users_by_id = {u.id: u for u in users}
+            mutual_friends = [users_by_id[fid] for fid in mutual_ids if fid in users_by_id]
+        return Response(
+            {'mutual_friends': FriendSummarySerializer(mutual_friends, many=True).data},
+            status=status.HTTP_200_OK
+        )